@@ -4,8 +4,8 @@ HvH Server Configuration Script
 Configures a CS:GO Legacy server specifically for Hack vs Hack gameplay
 """
 
+import os
 import sys
-import argparse
 from pathlib import Path
 
 # Add src directory to path
@@ -15,19 +15,24 @@ from logger import get_logger
 from server_config import ServerConfigurator
 
 
-def print_banner():
-    """Print HvH configuration banner"""
-    banner = """
+# HvH configuration banner (built once at import)
+BANNER_TEXT = """
 ╔══════════════════════════════════════════════════════════════╗
 ║          VileHvH - HvH Server Configuration                  ║
 ║          Configure your CS:GO Legacy HvH server              ║
 ╚══════════════════════════════════════════════════════════════╝
 """
-    print(banner)
+
+
+def print_banner():
+    """Print HvH configuration banner"""
+    sys.stdout.write(BANNER_TEXT + "\n")
 
 
 def main():
     """Main entry point"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Configure CS:GO Legacy server for HvH gameplay"
     )
@@ -102,15 +107,18 @@ def main():
     # Initialize logger
     logger = get_logger()
     
-    # Validate server directory
+    # Validate server directory (one listing answers both checks)
     server_dir = Path(args.server_dir)
-    if not server_dir.exists():
+    try:
+        with os.scandir(server_dir) as it:
+            has_csgo_dir = any(entry.name == "csgo" and entry.is_dir() for entry in it)
+    except (FileNotFoundError, NotADirectoryError):
         logger.error(f"Server directory not found: {server_dir}")
         logger.error("Please install the server first using scripts/setup.py")
         return 1
     
     csgo_dir = server_dir / "csgo"
-    if not csgo_dir.exists():
+    if not has_csgo_dir:
         logger.error(f"CS:GO directory not found: {csgo_dir}")
         logger.error("This doesn't appear to be a valid CS:GO server installation")
         return 1
@@ -6,29 +6,47 @@ Demonstrates how to install plugins using plugin_manager.py
 This script can be extended to install all your favorite HvH plugins!
 """
 
-import sys
+import atexit
+import contextlib
+import os
 import re
+import sys
 import subprocess
 import tempfile
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, List
+from urllib.parse import urlsplit
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from file_utils import remove_tree
 from logger import get_logger
-from plugin_manager import PluginManager
 
+if TYPE_CHECKING:
+    from plugin_manager import PluginManager
 
-def print_usage():
-    """Print usage information"""
-    print("""
+# Shared logger for this script
+logger = get_logger()
+
+# GitHub owner/repo names (bounded by GitHub's own length limits)
+_GITHUB_OWNER_RE = re.compile(r'[\w-]{1,39}')
+_GITHUB_REPO_RE = re.compile(r'[\w.-]{1,100}')
+
+# Temp clone cleanup runs in the background; pending deletes finish at exit
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=2)
+atexit.register(_CLEANUP_POOL.shutdown, wait=True)
+
+
+# Usage text (built once at import)
+USAGE_TEXT = """
 ╔══════════════════════════════════════════════════════════════╗
 ║           VileHvH - Plugin Installation Utility              ║
 ╚══════════════════════════════════════════════════════════════╝
 
 Usage:
-  python3 install_plugins.py <server_directory> [plugin_source]
+  python3 install_plugins.py <server_directory> [plugin_source ...]
 
 Examples:
   # Install from GitHub URL (with or without .git)
@@ -38,23 +56,47 @@ Examples:
   # Install from local directory
   python3 install_plugins.py ~/csgo-server ./CSGO-Essentials-master
   
+  # Install several plugins at once (GitHub sources are cloned in parallel)
+  python3 install_plugins.py ~/csgo-server https://github.com/HvH-gg/CSGO-Essentials https://github.com/HvH-gg/CSGO-Item-CrashFix
+  
   # Interactive mode (prompts for GitHub URL or path)
   python3 install_plugins.py ~/csgo-server
 
 Options:
   server_directory    Path to CS:GO server installation
-  plugin_source       GitHub URL or local path to plugin (must contain 'addons' folder)
-    """)
+  plugin_source       One or more GitHub URLs or local paths to plugins (must contain 'addons' folder)
+    """
+
+
+def print_usage():
+    """Print usage information"""
+    sys.stdout.write(USAGE_TEXT + "\n")
 
 
 def is_github_url(source: str) -> bool:
-    """Check if the source is a GitHub URL"""
-    github_patterns = [
-        r'https?://github\.com/[\w-]+/[\w.-]+/?',
-        r'git@github\.com:[\w-]+/[\w.-]+\.git',
-        r'github\.com/[\w-]+/[\w.-]+',
-    ]
-    return any(re.match(pattern, source) for pattern in github_patterns)
+    """Check if the source is a GitHub URL (owner/repo on github.com)"""
+    # Fast path for obvious local paths
+    if source.startswith(('./', '../', '/', '~', '.\\')) or 'github.com' not in source.lower():
+        return False
+    
+    if source.startswith('git@github.com:'):
+        path = source[len('git@github.com:'):]
+    else:
+        try:
+            parts = urlsplit(source if '://' in source else 'https://' + source)
+        except ValueError:
+            return False
+        
+        if parts.scheme not in ('http', 'https'):
+            return False
+        if parts.netloc.lower() not in ('github.com', 'www.github.com'):
+            return False
+        path = parts.path
+    
+    owner, _, repo = path.strip('/').partition('/')
+    if repo.endswith('.git'):
+        repo = repo[:-4]
+    return bool(_GITHUB_OWNER_RE.fullmatch(owner) and _GITHUB_REPO_RE.fullmatch(repo))
 
 
 def normalize_github_url(url: str) -> str:
@@ -71,68 +113,80 @@ def normalize_github_url(url: str) -> str:
     return url
 
 
-def clone_from_github(url: str) -> Path:
+@contextlib.contextmanager
+def temp_clone_dir():
+    """Temporary directory for a plugin clone, removed in the background on exit"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="vilehvh_plugin_"))
+    try:
+        yield temp_dir
+    finally:
+        logger.debug(f"Cleaning up temp directory: {temp_dir}")
+        _CLEANUP_POOL.submit(remove_tree, temp_dir)
+
+
+def clone_from_github(url: str, dest: Path) -> bool:
     """
-    Clone a GitHub repository to a temporary directory
+    Clone a GitHub repository into dest (an empty directory)
     
     Returns:
-        Path to cloned directory, or None if failed
+        True if the clone succeeded
     """
-    logger = get_logger()
-    
     # Normalize URL
     url = normalize_github_url(url)
     
     logger.info(f"Cloning from GitHub: {url}")
     
-    # Create temporary directory
-    temp_dir = Path(tempfile.mkdtemp(prefix="vilehvh_plugin_"))
-    
     try:
-        # Clone the repository
+        # Clone the repository (latest commit of the default branch only,
+        # blobs fetched on checkout; never prompt for credentials)
         result = subprocess.run(
-            ['git', 'clone', '--depth', '1', url, str(temp_dir)],
-            capture_output=True,
+            ['git', '-c', 'protocol.version=2', 'clone', '--quiet',
+             '--depth', '1', '--single-branch', '--no-tags', '--filter=blob:none',
+             url, str(dest)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=60
+            timeout=120,
+            env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
         )
         
         if result.returncode != 0:
             logger.error(f"Git clone failed: {result.stderr}")
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            return None
+            return False
         
-        logger.success(f"Cloned successfully to: {temp_dir}")
-        return temp_dir
+        logger.success(f"Cloned successfully to: {dest}")
+        return True
     
     except subprocess.TimeoutExpired:
-        logger.error("Git clone timed out after 60 seconds")
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        return None
+        logger.error("Git clone timed out after 120 seconds")
+        return False
     except FileNotFoundError:
         logger.error("Git is not installed. Please install git first.")
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        return None
+        return False
     except Exception as e:
         logger.error(f"Clone failed: {e}")
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        return None
+        return False
 
 
-def install_from_directory(pm: PluginManager, plugin_dir: Path):
+def install_from_directory(pm: "PluginManager", plugin_dir: Path):
     """Install a plugin from a local directory"""
-    logger = get_logger()
-    
     logger.section(f"Installing Plugin from Directory")
     logger.info(f"Plugin directory: {plugin_dir}")
     
-    if not plugin_dir.exists():
-        logger.error(f"Plugin directory not found: {plugin_dir}")
-        return False
-    
-    # Check if it has the expected structure
+    # Check if it has the expected structure (one listing of addons/ covers
+    # both the addons and sourcemod checks; plugin_dir itself is only
+    # stat'ed to pick the right error message)
     addons_dir = plugin_dir / "addons"
-    if not addons_dir.exists():
+    try:
+        with os.scandir(addons_dir) as it:
+            has_sourcemod_dir = any(
+                entry.name == "sourcemod" and entry.is_dir(follow_symlinks=False) for entry in it
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        if not plugin_dir.exists():
+            logger.error(f"Plugin directory not found: {plugin_dir}")
+            return False
+        
         logger.error("Plugin directory must contain an 'addons' folder")
         logger.info("Expected structure:")
         logger.info("  plugin-name/")
@@ -142,11 +196,14 @@ def install_from_directory(pm: PluginManager, plugin_dir: Path):
         logger.info("            └── scripting/*.sp")
         return False
     
+    if not has_sourcemod_dir:
+        logger.warning("No 'addons/sourcemod' folder found, installing addons as-is")
+    
     # Install the plugin
     return pm.install_plugin_from_directory(plugin_dir)
 
 
-def install_plugin(pm: PluginManager, source: str) -> bool:
+def install_plugin(pm: "PluginManager", source: str) -> bool:
     """
     Install a plugin from GitHub URL or local directory
     
@@ -157,39 +214,52 @@ def install_plugin(pm: PluginManager, source: str) -> bool:
     Returns:
         True if successful
     """
-    logger = get_logger()
-    temp_dir = None
+    return install_plugins(pm, [source])
+
+
+def install_plugins(pm: "PluginManager", sources: List[str]) -> bool:
+    """
+    Install plugins from GitHub URLs and/or local directories
     
-    try:
-        # Check if it's a GitHub URL
-        if is_github_url(source):
-            logger.info("Detected GitHub URL")
-            temp_dir = clone_from_github(source)
-            
-            if temp_dir is None:
-                return False
-            
-            # Install from the cloned directory
-            success = install_from_directory(pm, temp_dir)
+    GitHub sources are cloned concurrently; the installs themselves run
+    one at a time, in the order given.
+    
+    Args:
+        pm: PluginManager instance
+        sources: GitHub URLs or local directory paths
+    
+    Returns:
+        True if every plugin was installed successfully
+    """
+    github_sources = [source for source in sources if is_github_url(source)]
+    
+    with contextlib.ExitStack() as stack:
+        # One temp directory per GitHub source, all removed on exit
+        clone_dirs = {source: stack.enter_context(temp_clone_dir()) for source in github_sources}
+        cloned = {}
+        
+        if clone_dirs:
+            logger.info(f"Detected {len(clone_dirs)} GitHub URL(s)")
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                cloned = dict(zip(clone_dirs, executor.map(clone_from_github, clone_dirs, clone_dirs.values())))
+        
+        all_success = True
+        for source in sources:
+            if source in clone_dirs:
+                # Install from the cloned directory
+                success = cloned[source] and install_from_directory(pm, clone_dirs[source])
+            else:
+                # Treat as local directory
+                plugin_dir = Path(source).expanduser()
+                success = install_from_directory(pm, plugin_dir)
             
-        else:
-            # Treat as local directory
-            plugin_dir = Path(source).expanduser()
-            success = install_from_directory(pm, plugin_dir)
+            all_success = all_success and success
         
-        return success
-    
-    finally:
-        # Clean up temporary directory
-        if temp_dir and temp_dir.exists():
-            logger.debug(f"Cleaning up temp directory: {temp_dir}")
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        return all_success
 
 
-def list_plugins(pm: PluginManager):
+def list_plugins(pm: "PluginManager"):
     """List all installed plugins"""
-    logger = get_logger()
-    
     logger.section("Installed Plugins")
     plugins = pm.list_installed_plugins()
     
@@ -203,8 +273,6 @@ def list_plugins(pm: PluginManager):
 
 def main():
     """Main entry point"""
-    logger = get_logger()
-    
     # Check arguments
     if len(sys.argv) < 2 or sys.argv[1] in ["-h", "--help"]:
         print_usage()
@@ -217,7 +285,9 @@ def main():
         logger.error(f"Server directory not found: {server_dir}")
         return 1
     
-    # Initialize plugin manager
+    # Initialize plugin manager (imported here so --help stays cheap)
+    from plugin_manager import PluginManager
+    
     pm = PluginManager(server_dir)
     
     # Check if SourceMod is installed
@@ -228,11 +298,11 @@ def main():
     # List currently installed plugins
     list_plugins(pm)
     
-    # If plugin source provided, install it
+    # If plugin sources provided, install them
     if len(sys.argv) >= 3:
-        plugin_source = sys.argv[2]
+        plugin_sources = sys.argv[2:]
         
-        if install_plugin(pm, plugin_source):
+        if install_plugins(pm, plugin_sources):
             logger.success("Plugin installation complete!")
             logger.info("")
             list_plugins(pm)
@@ -4,24 +4,28 @@ CS:GO Legacy Server Setup Script
 Main orchestration script for installing and configuring CS:GO Legacy servers
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from logger import get_logger
-from system_detect import detect_system, OSType
-from steamcmd_installer import SteamCMDInstaller
-from csgo_installer import CSGOInstaller
-from metamod_sourcemod_installer import MetamodSourcemodInstaller
+from system_detect import probe_system, OSType
+from system_cache import get_cache_dir, load_cached_system, save_cached_system
 from server_config import ServerConfigurator
+from file_utils import remove_tree
 
+# Shared logger for this script
+logger = get_logger()
 
-def print_banner():
-    """Print welcome banner"""
-    banner = """
+
+# Welcome banner (built once at import)
+BANNER_TEXT = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
 ║     CS:GO Legacy Server Setup Script                        ║
@@ -29,7 +33,46 @@ def print_banner():
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
 """
-    print(banner)
+
+# Recommended HvH plugins (name, git URL)
+HVH_PLUGINS = [
+    ("HvH Essentials", "https://github.com/HvH-gg/CSGO-Essentials.git"),
+    ("Item Crash Fix", "https://github.com/HvH-gg/CSGO-Item-CrashFix.git"),
+    ("Weapon Selector", "https://github.com/HvH-gg/CSGO-WeaponSelector.git"),
+]
+
+
+def print_banner():
+    """Print welcome banner"""
+    sys.stdout.write(BANNER_TEXT + "\n")
+
+
+# Accepted yes/no answers
+_YES = frozenset({'y', 'yes'})
+_NO = frozenset({'n', 'no'})
+
+
+def prompt_text(question: str, default: str = "") -> str:
+    """
+    Prompt user for a line of text
+    
+    Args:
+        question: Prompt to show (printed as-is, without a newline)
+        default: Answer to use if the user just presses Enter or stdin is closed
+    
+    Returns:
+        The stripped answer, or the default
+    """
+    sys.stdout.write(question)
+    sys.stdout.flush()
+    
+    answer = sys.stdin.readline()
+    if not answer:
+        # EOF (e.g. input piped from a file that ran out)
+        sys.stdout.write("\n")
+        return default
+    
+    return answer.strip() or default
 
 
 def prompt_yes_no(question: str, default: bool = True) -> bool:
@@ -38,37 +81,52 @@ def prompt_yes_no(question: str, default: bool = True) -> bool:
     
     Args:
         question: Question to ask
-        default: Default answer if user just presses Enter
+        default: Default answer if user just presses Enter or stdin is closed
     
     Returns:
         True for yes, False for no
     """
+    # Piped answers are read like typed ones; prompt_text gives "" at EOF,
+    # so a run with nothing (left) on stdin takes the default
     suffix = "[Y/n]" if default else "[y/N]"
     while True:
-        response = input(f"{question} {suffix}: ").strip().lower()
+        response = prompt_text(f"{question} {suffix}: ").lower()
         if not response:
             return default
-        if response in ['y', 'yes']:
+        if response in _YES:
             return True
-        if response in ['n', 'no']:
+        if response in _NO:
             return False
         print("Please answer 'y' or 'n'")
 
 
-def get_steam_credentials():
+def get_steam_credentials(username: Optional[str] = None):
     """
     Get Steam credentials from user
     
+    Without a terminal the username must be given (--steam-username); the
+    password is read from the STEAM_PASSWORD environment variable, and its
+    presence marks a first-time login.
+    
+    Args:
+        username: Steam username, if already known
+    
     Returns:
-        Tuple of (username, password, is_first_login)
+        Tuple of (username, password, is_first_login), or None if the
+        credentials can't be obtained non-interactively
     """
-    logger = get_logger()
+    if not sys.stdin.isatty():
+        if not username:
+            return None
+        password = os.environ.get("STEAM_PASSWORD") or None
+        return username, password, password is not None
     
     print("\n" + "="*60)
     print("Steam Login Information")
     print("="*60)
     
-    username = input("Steam username: ").strip()
+    if not username:
+        username = prompt_text("Steam username: ")
     
     is_first_login = prompt_yes_no(
         "Is this your first time logging in on this machine?",
@@ -83,8 +141,242 @@ def get_steam_credentials():
     return username, password, is_first_login
 
 
+def collect_user_inputs(args, sys_info) -> dict:
+    """
+    Ask all of the setup questions before any long-running step starts
+    
+    Args:
+        args: Parsed command line arguments
+        sys_info: Detected system information
+    
+    Returns:
+        Dict with install_dir (custom path or None for the default),
+        credentials (from get_steam_credentials, None when skipping CS:GO),
+        install_hvh_plugins, hostname, rcon_pass and gslt
+    """
+    logger.section("Setup Options")
+    
+    # Installation directory
+    install_dir = args.install_dir
+    if not install_dir:
+        if args.skip_csgo:
+            install_dir = prompt_text("Enter CS:GO server installation directory: ")
+        else:
+            from csgo_installer import CSGOInstaller
+            
+            # Use default and inform user
+            default_dir = CSGOInstaller.default_install_dir(sys_info)
+            logger.info(f"Using default installation directory: {default_dir}")
+            
+            if prompt_yes_no("Would you like to use a custom directory?", default=False):
+                install_dir = prompt_text("Enter custom installation path: ")
+    
+    # Steam credentials
+    credentials = None
+    if not args.skip_csgo:
+        credentials = get_steam_credentials(args.steam_username)
+    
+    # HvH plugins
+    logger.info("")
+    logger.info("Would you like to install recommended HvH plugins?")
+    logger.info("")
+    logger.info("Recommended plugins:")
+    logger.info("  1. HvH-gg Essentials     - Spawn protection, damage info, anti-exploit")
+    logger.info("  2. Item Crash Fix        - Prevents weapon pickup crashes")
+    logger.info("  3. Weapon Selector       - !guns menu for weapon selection")
+    logger.info("")
+    
+    install_plugins_choice = prompt_text("Install recommended HvH plugins? (y/n) [y]: ", default="y").lower()
+    install_hvh_plugins = install_plugins_choice in _YES
+    
+    # Server settings
+    logger.info("")
+    logger.info("Server Configuration:")
+    hostname = prompt_text("  Server hostname [VileHvH Server]: ", default="VileHvH Server")
+    rcon_pass = prompt_text("  RCON password [change_me]: ", default="change_me")
+    
+    logger.info("")
+    logger.info("Game Server Login Token (GSLT) is required for your server to show in server browser.")
+    logger.info("Get your GSLT from: https://steamcommunity.com/dev/managegameservers")
+    logger.info("(You can skip this now and add it later)")
+    gslt = prompt_text("  GSLT Token (or press Enter to skip): ")
+    
+    logger.info("")
+    logger.info("That's everything - the rest of setup runs unattended")
+    
+    return {
+        "install_dir": install_dir,
+        "credentials": credentials,
+        "install_hvh_plugins": install_hvh_plugins,
+        "hostname": hostname,
+        "rcon_pass": rcon_pass,
+        "gslt": gslt,
+    }
+
+
+def plugin_temp_root() -> Optional[str]:
+    """
+    Pick the parent directory for temporary plugin clones
+    
+    On Linux this is /dev/shm (RAM-backed) when it's writable, since the
+    clones are copied into the server and deleted right away. Set
+    VILEHVH_TMPFS=0 to use the normal temp directory instead.
+    
+    Returns:
+        Directory path, or None for tempfile's default
+    """
+    if sys.platform != 'linux' or os.environ.get("VILEHVH_TMPFS") == "0":
+        return None
+    
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+def remote_head(plugin_url: str) -> Optional[str]:
+    """
+    Get the commit a plugin repository's HEAD points to (one small round trip)
+    
+    Args:
+        plugin_url: Git URL of the plugin repository
+    
+    Returns:
+        Commit SHA, or None if it couldn't be determined
+    """
+    import subprocess
+    
+    try:
+        result = subprocess.run(
+            ['git', 'ls-remote', plugin_url, 'HEAD'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=15,
+            env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+        )
+    except Exception:
+        return None
+    
+    fields = result.stdout.split()
+    return fields[0] if result.returncode == 0 and fields else None
+
+
+def load_plugin_heads(install_dir: Path) -> dict:
+    """Load the plugin commits last installed into install_dir (URL -> SHA)"""
+    import json
+    
+    try:
+        with open(get_cache_dir() / "plugins.json", "r") as f:
+            heads = json.load(f).get(str(install_dir), {})
+        return heads if isinstance(heads, dict) else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_plugin_heads(install_dir: Path, heads: dict):
+    """Record the plugin commits installed into install_dir"""
+    import json
+    
+    cache_dir = get_cache_dir()
+    cache_path = cache_dir / "plugins.json"
+    
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    
+    cache[str(install_dir)] = heads
+    
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_dir / "plugins.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not write plugin cache: {e}")
+
+
+def clone_plugin(plugin_name: str, plugin_url: str, temp_root: Optional[str] = None,
+                 installed_head: Optional[str] = None):
+    """
+    Shallow-clone a plugin repository into a new temporary directory
+    
+    Args:
+        plugin_name: Display name of the plugin
+        plugin_url: Git URL of the plugin repository
+        temp_root: Parent directory for the clone (None for the default)
+        installed_head: Commit already installed; the clone is skipped if
+            the repository's HEAD still points to it
+    
+    Returns:
+        Tuple of (plugin_name, temp_dir, error, head); error is None on
+        success and head is the remote HEAD commit (None if unknown).
+        temp_dir is None if the clone was skipped or the directory couldn't
+        be created, otherwise the caller removes it.
+    """
+    import subprocess
+    import tempfile
+    
+    head = remote_head(plugin_url)
+    if installed_head and head == installed_head:
+        return plugin_name, None, None, head
+    
+    temp_dir = None
+    try:
+        temp_dir = Path(tempfile.mkdtemp(prefix="vilehvh_plugin_", dir=temp_root))
+        # Only stderr is kept (for the failure message); -q drops progress output
+        result = subprocess.run(
+            ['git', 'clone', '-q', '--depth', '1', '--single-branch', '--no-tags',
+             '--filter=blob:none', plugin_url, str(temp_dir)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=60
+        )
+        
+        if result.returncode != 0:
+            return plugin_name, temp_dir, result.stderr.strip() or f"git exited with {result.returncode}", head
+        
+        return plugin_name, temp_dir, None, head
+    
+    except Exception as e:
+        return plugin_name, temp_dir, str(e), head
+
+
+def load_system_info():
+    """
+    Get system information, reusing the last run's result if the system is unchanged
+    
+    Nothing is printed, so this can run while the banner is printed.
+    
+    Returns:
+        Tuple of (sys_info, cached)
+    """
+    sys_info = load_cached_system()
+    if sys_info is not None:
+        return sys_info, True
+    
+    return save_cached_system(probe_system()), False
+
+
 def main():
     """Main entry point"""
+    # Arguments first, so --help and usage errors exit without probing
+    # the system or writing the cache
+    args = parse_args()
+    
+    # Probe the system in the background while the banner is printed
+    with ThreadPoolExecutor(max_workers=1) as detect_executor:
+        sys_info_future = detect_executor.submit(load_system_info)
+        return _run_setup(args, sys_info_future)
+
+
+def parse_args():
+    """Parse command line arguments"""
     parser = argparse.ArgumentParser(
         description="CS:GO Legacy Server Setup Script",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -101,6 +393,9 @@ Examples:
   
   # Skip metamod/sourcemod installation
   python setup.py --skip-mods
+  
+  # Non-interactive run (first login reads the password from STEAM_PASSWORD)
+  STEAM_PASSWORD=... python setup.py --steam-username myaccount < /dev/null
         """
     )
     
@@ -110,6 +405,12 @@ Examples:
         help='Custom installation directory for CS:GO server'
     )
     
+    parser.add_argument(
+        '--steam-username',
+        type=str,
+        help='Steam username (required when not running in a terminal)'
+    )
+    
     parser.add_argument(
         '--skip-steamcmd',
         action='store_true',
@@ -131,28 +432,52 @@ Examples:
     parser.add_argument(
         '--validate',
         action='store_true',
-        default=True,
-        help='Validate CS:GO server files (default: True)'
+        default=False,
+        help='Validate CS:GO server files on an existing install '
+             '(always done on a first install; skipped if validated in the last 7 days)'
+    )
+    
+    parser.add_argument(
+        '--force-validate',
+        action='store_true',
+        help='Validate CS:GO server files even if validated recently'
+    )
+    
+    parser.add_argument(
+        '--force-update',
+        action='store_true',
+        help='Run the SteamCMD update even if the server is at the last installed build'
     )
     
     parser.add_argument(
         '--no-validate',
         action='store_false',
         dest='validate',
-        help='Skip validation of CS:GO server files'
+        help='Skip validation of CS:GO server files on an existing install (default)'
     )
     
-    args = parser.parse_args()
-    
-    # Print banner
-    print_banner()
+    return parser.parse_args()
+
+
+def _run_setup(args, sys_info_future):
+    """Run the setup steps"""
+    # Print banner (only for a person watching)
+    if sys.stdout.isatty():
+        print_banner()
     
-    # Initialize logger
-    logger = get_logger()
+    clone_executor = None
+    clone_futures = []
+    plugin_heads = {}
+    initial_update_pending = False
     
     try:
-        # Step 1: System Detection
-        sys_info = detect_system()
+        # Step 1: System Detection (started in the background by main)
+        sys_info, cached = sys_info_future.result()
+        
+        logger.section("System Detection")
+        logger.info("System information (cached):" if cached else "System information detected:")
+        for line in sys_info.iter_lines():
+            logger.info(f"  {line}")
         
         # Check if OS is supported
         if sys_info.os_type == OSType.UNKNOWN:
@@ -160,86 +485,135 @@ Examples:
             logger.error("This script supports Windows and Linux only")
             return 1
         
+        # Ask everything up front so the rest of setup runs unattended
+        inputs = collect_user_inputs(args, sys_info)
+        if not args.skip_csgo and inputs["credentials"] is None:
+            logger.error("No terminal to ask for Steam credentials")
+            logger.error("Pass --steam-username (and set STEAM_PASSWORD for a first login)")
+            return 1
+        
+        # Clone the HvH plugins in the background while SteamCMD, CS:GO and
+        # the mods install (they only need the network, not the server files)
+        if inputs["install_hvh_plugins"]:
+            # Plugins already installed into this server at the remote HEAD
+            # aren't cloned again
+            if inputs["install_dir"]:
+                plugin_target = Path(inputs["install_dir"])
+            else:
+                from csgo_installer import CSGOInstaller
+                
+                plugin_target = CSGOInstaller.default_install_dir(sys_info)
+            
+            if (plugin_target / "csgo" / "addons" / "sourcemod" / "plugins").is_dir():
+                plugin_heads = load_plugin_heads(plugin_target)
+            
+            temp_root = plugin_temp_root()
+            clone_executor = ThreadPoolExecutor(max_workers=len(HVH_PLUGINS))
+            clone_futures = [
+                clone_executor.submit(clone_plugin, name, url, temp_root, plugin_heads.get(url))
+                for name, url in HVH_PLUGINS
+            ]
+        
         # Step 2: Install SteamCMD
         if not args.skip_steamcmd:
+            from steamcmd_installer import SteamCMDInstaller
+            
             steamcmd_installer = SteamCMDInstaller(sys_info)
             
             if not steamcmd_installer.install():
                 logger.error("SteamCMD installation failed")
                 return 1
             
-            # Run initial update
             if not steamcmd_installer.is_installed():
                 logger.error("SteamCMD installation verification failed")
                 return 1
             
-            logger.info("Running initial SteamCMD update...")
-            steamcmd_installer.run_initial_update()
+            # SteamCMD bootstraps and self-updates whenever it starts, so the
+            # CS:GO download below doubles as the initial update; it only
+            # runs on its own if SteamCMD isn't started for CS:GO
+            initial_update_pending = True
             
             steamcmd_path = steamcmd_installer.get_steamcmd_path()
         else:
             logger.info("Skipping SteamCMD installation")
-            # Assume default paths
+            # Assume default paths, then fall back to a SteamCMD on PATH
+            # (e.g. installed by the distro's package manager)
             if sys_info.os_type == OSType.WINDOWS:
                 steamcmd_path = Path("C:/steamcmd/steamcmd.exe")
             else:
                 steamcmd_path = Path.home() / "steamcmd" / "steamcmd.sh"
             
             if not steamcmd_path.exists():
-                logger.error(f"SteamCMD not found at: {steamcmd_path}")
-                return 1
+                import shutil
+                
+                found = shutil.which("steamcmd") or shutil.which("steamcmd.sh")
+                if not found:
+                    logger.error(f"SteamCMD not found at: {steamcmd_path}")
+                    logger.error("(and no steamcmd on PATH)")
+                    return 1
+                
+                steamcmd_path = Path(found)
+                logger.info(f"Using SteamCMD from PATH: {steamcmd_path}")
         
         # Step 3: Install CS:GO Server
         if not args.skip_csgo:
+            from csgo_installer import CSGOInstaller
+            
             csgo_installer = CSGOInstaller(sys_info, steamcmd_path)
             
             # Set custom install directory if provided
-            if args.install_dir:
-                csgo_installer.set_install_directory(args.install_dir)
+            if inputs["install_dir"]:
+                csgo_installer.set_install_directory(inputs["install_dir"])
+            
+            # Nothing to download if the server is still at the build we installed
+            if (not (args.validate or args.force_validate or args.force_update)
+                    and csgo_installer.is_up_to_date()):
+                logger.info(f"CS:GO server is already installed (build {csgo_installer.current_buildid()})")
+                logger.info("Skipping SteamCMD update (use --force-update to run it anyway)")
             else:
-                # Use default and inform user
-                default_dir = csgo_installer.get_install_dir()
-                logger.info(f"Using default installation directory: {default_dir}")
+                # Make sure the install directory exists
+                if not csgo_installer.configure_install_dir():
+                    logger.error("Failed to configure installation directory")
+                    return 1
                 
-                if prompt_yes_no("Would you like to use a custom directory?", default=False):
-                    custom_dir = input("Enter custom installation path: ").strip()
-                    csgo_installer.set_install_directory(custom_dir)
-            
-            # Configure force_install_dir (must be done before login)
-            if not csgo_installer.configure_install_dir():
-                logger.error("Failed to configure installation directory")
-                return 1
-            
-            # Get Steam credentials
-            username, password, is_first_login = get_steam_credentials()
-            
-            # Login to Steam
-            if not csgo_installer.login(username, password, is_first_login):
-                logger.error("Steam login failed")
-                return 1
-            
-            # Install CS:GO server
-            if not csgo_installer.install_server(username, validate=args.validate):
-                logger.error("CS:GO server installation failed")
-                return 1
+                username, password, is_first_login = inputs["credentials"]
+                
+                # Login to Steam
+                if not csgo_installer.login(username, password, is_first_login):
+                    logger.error("Steam login failed")
+                    return 1
+                
+                # Install CS:GO server
+                if not csgo_installer.install_server(
+                    username,
+                    validate=args.validate,
+                    force_validate=args.force_validate
+                ):
+                    logger.error("CS:GO server installation failed")
+                    return 1
+                
+                initial_update_pending = False
+                csgo_installer.remember_buildid()
             
             install_dir = csgo_installer.get_install_dir()
         else:
             logger.info("Skipping CS:GO server installation")
             
-            # Need to get install directory
-            if args.install_dir:
-                install_dir = Path(args.install_dir)
-            else:
-                install_dir_input = input("Enter CS:GO server installation directory: ").strip()
-                install_dir = Path(install_dir_input)
+            install_dir = Path(inputs["install_dir"])
             
             if not install_dir.exists():
                 logger.error(f"CS:GO server directory not found: {install_dir}")
                 return 1
         
+        # Run initial update (if no CS:GO download started SteamCMD)
+        if initial_update_pending:
+            logger.info("Running initial SteamCMD update...")
+            steamcmd_installer.run_initial_update()
+        
         # Step 4: Install Metamod:Source and SourceMod
         if not args.skip_mods:
+            from metamod_sourcemod_installer import MetamodSourcemodInstaller
+            
             mod_installer = MetamodSourcemodInstaller(sys_info, install_dir)
             
             if not mod_installer.install_all():
@@ -250,65 +624,50 @@ Examples:
             logger.info("Skipping Metamod:Source and SourceMod installation")
         
         # Step 5: Install HvH Plugins (Optional)
-        logger.section("HvH Plugin Installation")
-        logger.info("")
-        logger.info("Would you like to install recommended HvH plugins?")
-        logger.info("")
-        logger.info("Recommended plugins:")
-        logger.info("  1. HvH-gg Essentials     - Spawn protection, damage info, anti-exploit")
-        logger.info("  2. Item Crash Fix        - Prevents weapon pickup crashes")
-        logger.info("  3. Weapon Selector       - !guns menu for weapon selection")
-        logger.info("")
-        
-        install_plugins_choice = input("Install recommended HvH plugins? (y/n) [y]: ").strip().lower()
-        install_hvh_plugins = install_plugins_choice in ['y', 'yes', '']
+        install_hvh_plugins = inputs["install_hvh_plugins"]
         
         if install_hvh_plugins:
-            logger.info("")
+            logger.section("HvH Plugin Installation")
             logger.info("Installing HvH plugins from GitHub...")
             
             from plugin_manager import PluginManager
-            import subprocess
-            import tempfile
-            import shutil
+            from concurrent.futures import as_completed
             
             pm = PluginManager(install_dir)
             
-            hvh_plugins = [
-                ("HvH Essentials", "https://github.com/HvH-gg/CSGO-Essentials.git"),
-                ("Item Crash Fix", "https://github.com/HvH-gg/CSGO-Item-CrashFix.git"),
-                ("Weapon Selector", "https://github.com/HvH-gg/CSGO-WeaponSelector.git"),
-            ]
+            # Install each plugin as soon as its clone is done
+            future_urls = {future: url for future, (_, url) in zip(clone_futures, HVH_PLUGINS)}
             
-            for plugin_name, plugin_url in hvh_plugins:
+            for future in as_completed(clone_futures):
+                plugin_name, temp_dir, error, head = future.result()
+                plugin_url = future_urls[future]
+                
+                if not error and temp_dir is None:
+                    logger.info(f"{plugin_name} is already up to date")
+                    continue
+                
                 logger.info(f"Installing {plugin_name}...")
-                temp_dir = None
+                plugin_heads.pop(plugin_url, None)
                 
                 try:
-                    # Clone from GitHub
-                    temp_dir = Path(tempfile.mkdtemp(prefix="vilehvh_plugin_"))
-                    result = subprocess.run(
-                        ['git', 'clone', '--depth', '1', plugin_url, str(temp_dir)],
-                        capture_output=True,
-                        text=True,
-                        timeout=60
-                    )
-                    
-                    if result.returncode == 0:
-                        if pm.install_plugin_from_directory(temp_dir):
-                            logger.success(f"{plugin_name} installed!")
-                        else:
-                            logger.warning(f"Failed to install {plugin_name}")
-                    else:
+                    if error:
                         logger.warning(f"Failed to clone {plugin_name}")
+                        logger.debug(error)
+                    elif pm.install_plugin_from_directory(temp_dir):
+                        logger.success(f"{plugin_name} installed!")
+                        if head:
+                            plugin_heads[plugin_url] = head
+                    else:
+                        logger.warning(f"Failed to install {plugin_name}")
                 
                 except Exception as e:
                     logger.warning(f"Error installing {plugin_name}: {e}")
                 
                 finally:
-                    if temp_dir and temp_dir.exists():
-                        shutil.rmtree(temp_dir, ignore_errors=True)
+                    if temp_dir:
+                        remove_tree(temp_dir)
             
+            save_plugin_heads(install_dir, plugin_heads)
             logger.info("")
         
         # Step 6: Configure HvH Server Settings
@@ -317,16 +676,9 @@ Examples:
         logger.info("Configuring your server for Hack vs Hack gameplay...")
         logger.info("")
         
-        # Prompt for server settings
-        logger.info("Server Configuration:")
-        hostname = input("  Server hostname [VileHvH Server]: ").strip() or "VileHvH Server"
-        rcon_pass = input("  RCON password [change_me]: ").strip() or "change_me"
-        
-        logger.info("")
-        logger.info("Game Server Login Token (GSLT) is required for your server to show in server browser.")
-        logger.info("Get your GSLT from: https://steamcommunity.com/dev/managegameservers")
-        logger.info("(You can skip this now and add it later)")
-        gslt = input("  GSLT Token (or press Enter to skip): ").strip()
+        hostname = inputs["hostname"]
+        rcon_pass = inputs["rcon_pass"]
+        gslt = inputs["gslt"]
         
         # Configure HvH settings
         configurator = ServerConfigurator(install_dir)
@@ -360,56 +712,60 @@ Examples:
         # Success!
         logger.section("Setup Complete!")
         logger.success("CS:GO Legacy HvH server setup completed successfully!")
-        logger.info("")
-        logger.info("═" * 60)
-        logger.info("  HvH SERVER CONFIGURATION")
-        logger.info("═" * 60)
-        logger.info(f"  Hostname: {hostname}")
-        logger.info(f"  Mode: Deathmatch")
-        logger.info(f"  Tickrate: 128 (optimized for HvH)")
-        logger.info(f"  Starting Map: de_mirage")
-        logger.info(f"  Max Money: $16000 | Buy anytime/anywhere")
-        logger.info(f"  Respawn: Instant")
-        logger.info(f"  Friendly Fire: OFF (utility plugin coming)")
-        logger.info(f"  RCON Password: {rcon_pass}")
-        if gslt:
-            logger.info(f"  GSLT: Configured ✓")
-        else:
-            logger.warning("  GSLT: Not configured (add later)")
-        logger.info("═" * 60)
-        logger.info("")
+        
+        # Each block is rendered once and logged in one call, so it can't be
+        # interleaved with other output
+        rule = "═" * 60
+        gslt_status = "Configured ✓" if gslt else "Not configured (add later)"
+        gslt_file = f"\n  GSLT saved: {install_dir}/csgo/gslt.txt" if gslt else ""
+        
+        logger.info(f"""
+{rule}
+  HvH SERVER CONFIGURATION
+{rule}
+  Hostname: {hostname}
+  Mode: Deathmatch
+  Tickrate: 128 (optimized for HvH)
+  Starting Map: de_mirage
+  Max Money: $16000 | Buy anytime/anywhere
+  Respawn: Instant
+  Friendly Fire: OFF (utility plugin coming)
+  RCON Password: {rcon_pass}
+  GSLT: {gslt_status}
+{rule}
+""")
         logger.warning("⚠️  IMPORTANT: HvH servers MUST use -insecure flag!")
         logger.warning("⚠️  This disables VAC to allow cheaters to play")
-        logger.info("")
-        logger.info("Server installation directory:")
-        logger.info(f"  {install_dir}")
-        logger.info("")
-        logger.info("Configuration files:")
-        logger.info(f"  Server config: {install_dir}/csgo/cfg/server.cfg")
-        logger.info(f"  steam.inf: {install_dir}/csgo/steam.inf")
-        if gslt:
-            logger.info(f"  GSLT saved: {install_dir}/csgo/gslt.txt")
-        logger.info("")
-        logger.info("Next steps:")
-        logger.info("  1. Add yourself as SourceMod admin (see below)")
-        logger.info("  2. Install HvH plugins (use scripts/install_plugins.py)")
-        logger.info("  3. Start your server!")
-        logger.info("")
-        logger.info("To add yourself as admin:")
-        logger.info(f"  nano {install_dir}/csgo/addons/sourcemod/configs/admins_simple.ini")
-        logger.info('  Add: "YOUR_STEAM_ID" "z" // Your Name')
-        logger.info("")
-        logger.info("═" * 60)
-        logger.info("  START YOUR HvH SERVER")
-        logger.info("═" * 60)
-        logger.info(f"cd {install_dir}")
-        logger.info(launch_cmd)
-        logger.info("═" * 60)
-        logger.info("")
+        logger.info(f"""
+Server installation directory:
+  {install_dir}
+
+Configuration files:
+  Server config: {install_dir}/csgo/cfg/server.cfg
+  steam.inf: {install_dir}/csgo/steam.inf{gslt_file}
+
+Next steps:
+  1. Add yourself as SourceMod admin (see below)
+  2. Install HvH plugins (use scripts/install_plugins.py)
+  3. Start your server!
+
+To add yourself as admin:
+  nano {install_dir}/csgo/addons/sourcemod/configs/admins_simple.ini
+  Add: "YOUR_STEAM_ID" "z" // Your Name
+
+{rule}
+  START YOUR HvH SERVER
+{rule}
+cd {install_dir}
+{launch_cmd}
+{rule}
+""")
         if not gslt:
-            logger.warning("💡 TIP: Get your GSLT from:")
-            logger.warning("   https://steamcommunity.com/dev/managegameservers")
-            logger.warning("   Then add it to the launch command")
+            logger.warning(
+                "💡 TIP: Get your GSLT from:\n"
+                "   https://steamcommunity.com/dev/managegameservers\n"
+                "   Then add it to the launch command"
+            )
             logger.info("")
         logger.success("Ready to host HvH! Welcome to new beginnings! 🔥")
         
@@ -423,6 +779,15 @@ Examples:
         logger.critical(f"Unexpected error: {e}")
         logger.critical("Please check the log file for details")
         return 1
+    
+    finally:
+        # Remove any plugin clones that weren't installed (e.g. setup failed early)
+        if clone_executor:
+            clone_executor.shutdown(wait=True)
+            for future in clone_futures:
+                _, temp_dir, _, _ = future.result()
+                if temp_dir and temp_dir.exists():
+                    remove_tree(temp_dir)
 
 
 if __name__ == "__main__":
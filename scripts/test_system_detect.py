@@ -5,6 +5,7 @@ Run this before the full setup to check if your system is detected correctly
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src directory to path
@@ -15,8 +16,8 @@ from system_detect import detect_system, check_package_installed
 def main():
     print("Testing system detection...\n")
     
-    # Detect system
-    sys_info = detect_system()
+    # Detect system (always for real, this is what we're testing)
+    sys_info = detect_system(refresh=True)
     
     print("\n" + "="*60)
     print("System Detection Test Results")
@@ -39,10 +40,15 @@ def main():
             test_packages = ["Python.Python.3", "Git.Git"]
             break
     
-    for package in test_packages:
-        installed = check_package_installed(package, sys_info)
-        status = "✓ INSTALLED" if installed else "✗ NOT FOUND"
-        print(f"  {package:<20} {status}")
+    # Check the packages concurrently (some managers need a process per
+    # package), then print in order once all are done
+    if test_packages:
+        with ThreadPoolExecutor(max_workers=min(len(test_packages), 4)) as executor:
+            results = list(executor.map(lambda package: check_package_installed(package, sys_info), test_packages))
+        
+        for package, installed in zip(test_packages, results):
+            status = "✓ INSTALLED" if installed else "✗ NOT FOUND"
+            print(f"  {package:<20} {status}")
     
     print("\n" + "="*60)
     print("System detection test complete!")
@@ -4,12 +4,24 @@ CS:GO Legacy server installation module
 Handles server installation, login, and configuration
 """
 
+import json
+import os
+import re
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 from logger import get_logger
 from system_detect import SystemInfo, OSType
+from system_cache import get_cache_dir
+
+
+# SteamCMD output lines worth showing during app_update (matched on raw bytes)
+_STEAMCMD_OUTPUT_RE = re.compile(rb"Update state|(?i:progress):|Success!")
+
+# "buildid" entry of a SteamCMD app manifest
+_BUILDID_RE = re.compile(r'"buildid"\s+"(\d+)"')
 
 
 class CSGOInstaller:
@@ -17,19 +29,38 @@ class CSGOInstaller:
     
     CSGO_APP_ID = "740"
     
+    # Stamp left in the install dir after a successful validate, and how long
+    # it suppresses re-validating (a validate re-hashes every game file)
+    VALIDATE_STAMP = ".vilehvh_validated"
+    VALIDATE_MAX_AGE_DAYS = 7
+    
     def __init__(self, sys_info: SystemInfo, steamcmd_path: Path):
         self.sys_info = sys_info
         self.steamcmd_path = steamcmd_path
         self.logger = get_logger()
         
         # Determine install path based on OS
-        if sys_info.os_type == OSType.WINDOWS:
-            self.install_dir = Path("C:/csgo-server")
-        else:
-            self.install_dir = Path.home() / "csgo-server"
+        self.install_dir = self.default_install_dir(sys_info)
+        
+        # String forms used to build SteamCMD command lines
+        self._steamcmd_str = str(steamcmd_path)
+        self._steamcmd_dir_str = str(steamcmd_path.parent)
+        self._cache_install_dir_strings()
         
         self.first_login = False
     
+    def _cache_install_dir_strings(self):
+        """Refresh the cached string forms of install_dir"""
+        self._install_dir_str = str(self.install_dir)
+        self._install_flag = f"+force_install_dir {self._install_dir_str}"
+    
+    @staticmethod
+    def default_install_dir(sys_info: SystemInfo) -> Path:
+        """Get the default CS:GO server installation directory for this OS"""
+        if sys_info.os_type == OSType.WINDOWS:
+            return Path("C:/csgo-server")
+        return Path.home() / "csgo-server"
+    
     def set_install_directory(self, custom_path: Optional[str] = None):
         """
         Set the CS:GO server installation directory
@@ -39,38 +70,29 @@ class CSGOInstaller:
         """
         if custom_path:
             self.install_dir = Path(custom_path)
+            self._cache_install_dir_strings()
         
         self.logger.info(f"CS:GO server will be installed to: {self.install_dir}")
         self.install_dir.mkdir(parents=True, exist_ok=True)
     
     def configure_install_dir(self) -> bool:
         """
-        Configure the force_install_dir in SteamCMD
-        This MUST be done while logged out, before first login
+        Prepare the installation directory for SteamCMD
+        
+        Every SteamCMD run (login, app_update) passes +force_install_dir
+        itself, so this only makes sure the directory exists rather than
+        starting SteamCMD just to set it and quit.
         """
-        self.logger.info("Configuring installation directory (must be done before login)...")
+        self.logger.info("Configuring installation directory...")
         
         try:
-            # Run SteamCMD with force_install_dir and quit
-            # This sets the install directory for subsequent commands
-            cmd = [
-                str(self.steamcmd_path),
-                f"+force_install_dir {self.install_dir}",
-                "+quit"
-            ]
-            
-            subprocess.run(
-                cmd,
-                check=True,
-                cwd=self.steamcmd_path.parent
-            )
-            
-            self.logger.success(f"Installation directory configured: {self.install_dir}")
-            return True
-        
-        except subprocess.CalledProcessError as e:
+            self.install_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
             self.logger.error(f"Failed to configure installation directory: {e}")
             return False
+        
+        self.logger.success(f"Installation directory configured: {self.install_dir}")
+        return True
     
     def login(self, username: str, password: Optional[str] = None, is_first_login: bool = False) -> bool:
         """
@@ -100,8 +122,8 @@ class CSGOInstaller:
             # First login with password - interactive mode
             try:
                 cmd = [
-                    str(self.steamcmd_path),
-                    f"+force_install_dir {self.install_dir}",
+                    os.path.abspath(self._steamcmd_str),
+                    self._install_flag,
                     f"+login {username} {password}"
                 ]
                 
@@ -109,18 +131,10 @@ class CSGOInstaller:
                 self.logger.info("You will need to enter your Steam Guard code when prompted")
                 
                 # Run interactively so user can enter Steam Guard code
-                process = subprocess.Popen(
-                    cmd,
-                    cwd=self.steamcmd_path.parent,
-                    stdin=sys.stdin,
-                    stdout=sys.stdout,
-                    stderr=sys.stderr
-                )
+                # (waits for user to complete login and type 'exit')
+                returncode = self._run_interactive(cmd)
                 
-                # Wait for user to complete login and type 'exit'
-                process.wait()
-                
-                if process.returncode == 0:
+                if returncode == 0:
                     self.logger.success("First-time login successful! Credentials cached")
                     self.first_login = True
                     return True
@@ -133,48 +147,147 @@ class CSGOInstaller:
                 return False
         
         else:
-            # Subsequent logins - credentials are cached, no password needed
-            self.logger.info("Using cached credentials...")
+            # Subsequent logins - credentials are cached, no password needed.
+            # install_server logs in with the same cached credentials as part
+            # of its own SteamCMD run, so there is no separate login-and-quit
+            # run here (each SteamCMD start pays its bootstrap/self-update check)
+            self.logger.info("Using cached credentials (login runs with the server download)")
+            return True
+    
+    def _run_interactive(self, cmd: list) -> int:
+        """
+        Run SteamCMD attached to the user's terminal
+        
+        On POSIX it runs under a pseudo-terminal, so its prompts (e.g. the
+        Steam Guard code) are line-buffered and shown even when our own
+        stdout is not a TTY (nohup, CI, some tmux setups).
+        
+        Args:
+            cmd: Command and arguments as list
+        
+        Returns:
+            SteamCMD's exit code
+        """
+        if sys.platform == 'win32':
+            process = subprocess.Popen(
+                cmd,
+                cwd=self._steamcmd_dir_str,
+                stdin=sys.stdin,
+                stdout=sys.stdout,
+                stderr=sys.stderr
+            )
+            return process.wait()
+        
+        import pty
+        import termios
+        import tty
+        
+        # pty.spawn has no cwd argument, so fork by hand and change
+        # directory only in the child
+        sys.stdout.flush()
+        pid, master_fd = pty.fork()
+        if pid == 0:
             try:
-                cmd = [
-                    str(self.steamcmd_path),
-                    f"+force_install_dir {self.install_dir}",
-                    f"+login {username}",
-                    "+quit"
-                ]
-                
-                subprocess.run(
-                    cmd,
-                    check=True,
-                    cwd=self.steamcmd_path.parent
-                )
-                
-                self.logger.success("Login successful (cached credentials)")
-                return True
+                os.chdir(self._steamcmd_dir_str)
+                os.execvp(cmd[0], cmd)
+            finally:
+                os._exit(127)
+        
+        stdin_fd = sys.stdin.fileno()
+        try:
+            saved_mode = termios.tcgetattr(stdin_fd)
+            tty.setraw(stdin_fd)
+        except termios.error:
+            saved_mode = None
+        
+        try:
+            self._copy_pty(master_fd, stdin_fd, sys.stdout.fileno())
+        finally:
+            if saved_mode is not None:
+                termios.tcsetattr(stdin_fd, termios.TCSAFLUSH, saved_mode)
+            os.close(master_fd)
+        
+        _, status = os.waitpid(pid, 0)
+        if os.WIFEXITED(status):
+            return os.WEXITSTATUS(status)
+        return -os.WTERMSIG(status)
+    
+    @staticmethod
+    def _copy_pty(master_fd: int, stdin_fd: int, stdout_fd: int):
+        """
+        Copy the child's output to stdout and stdin to the child (like pty.spawn)
+        
+        Returns once the child closes its side of the pseudo-terminal.
+        
+        Args:
+            master_fd: Master side of the child's pseudo-terminal
+            stdin_fd: Our standard input
+            stdout_fd: Our standard output
+        """
+        import select
+        
+        def write_all(fd, data):
+            while data:
+                data = data[os.write(fd, data):]
+        
+        fds = [master_fd, stdin_fd]
+        while True:
+            readable, _, _ = select.select(fds, [], [])
             
-            except subprocess.CalledProcessError as e:
-                self.logger.error(f"Login failed: {e}")
-                return False
+            if master_fd in readable:
+                try:
+                    data = os.read(master_fd, 1024)
+                except OSError:
+                    # Linux reports EIO once the child has exited
+                    data = b""
+                if not data:
+                    return
+                write_all(stdout_fd, data)
+            
+            if stdin_fd in readable:
+                data = os.read(stdin_fd, 1024)
+                if data:
+                    write_all(master_fd, data)
+                else:
+                    fds.remove(stdin_fd)
     
-    def install_server(self, username: str, validate: bool = True) -> bool:
+    def install_server(self, username: str, validate: bool = False, force_validate: bool = False) -> bool:
         """
         Download/update CS:GO Legacy server
         
+        Game files are always validated on a first install. On an existing
+        install they are only validated when asked to, and not again within
+        VALIDATE_MAX_AGE_DAYS of the last successful validate unless forced.
+        
         Args:
             username: Steam username (must be logged in)
             validate: Whether to validate game files
+            force_validate: Validate even if validated recently
         
         Returns:
             True if successful, False otherwise
         """
         self.logger.section("Installing/Updating CS:GO Legacy Server")
         
+        # Decide whether this run validates
+        if force_validate:
+            validate = True
+        elif not self.is_installed():
+            validate = True
+            self.logger.info("First install - game files will be validated")
+        elif validate and self._validated_recently():
+            validate = False
+            self.logger.info(
+                f"Game files validated within the last {self.VALIDATE_MAX_AGE_DAYS} days, "
+                "skipping validation (use --force-validate to override)"
+            )
+        
         # Build command
         validate_flag = "validate" if validate else ""
         
         cmd = [
-            str(self.steamcmd_path),
-            f"+force_install_dir {self.install_dir}",
+            self._steamcmd_str,
+            self._install_flag,
             f"+login {username}",
             f"+app_update {self.CSGO_APP_ID} {validate_flag}",
             "+quit"
@@ -187,29 +300,57 @@ class CSGOInstaller:
         try:
             process = subprocess.Popen(
                 cmd,
-                cwd=self.steamcmd_path.parent,
+                cwd=self._steamcmd_dir_str,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
+                stderr=subprocess.STDOUT
             )
             
-            # Stream output
+            # Stream output (only matching lines are decoded; lookups are
+            # hoisted out of the loop, which can run for 100k+ lines).
+            # The pipe is read in 64 KiB chunks and split into lines here,
+            # so a burst of output costs one read instead of one per line.
             if process.stdout:
-                for line in process.stdout:
-                    line = line.strip()
-                    if line:
+                search = _STEAMCMD_OUTPUT_RE.search
+                log_info = self.logger.info
+                log_success = self.logger.success
+                fd = process.stdout.fileno()
+                pending = b""
+                
+                while True:
+                    chunk = os.read(fd, 65536)
+                    if chunk:
+                        raw_lines = (pending + chunk).split(b"\n")
+                        pending = raw_lines.pop()
+                    else:
+                        # EOF: flush a final line without a newline
+                        raw_lines, pending = [pending], b""
+                    
+                    for raw_line in raw_lines:
+                        match = search(raw_line)
+                        if not match:
+                            continue
+                        
+                        line = raw_line.decode('utf-8', 'replace').strip()
+                        
                         # Show progress updates
-                        if "Update state" in line or "progress:" in line.lower():
-                            self.logger.info(line)
-                        elif "Success!" in line:
-                            self.logger.success(line)
+                        if match.group() == b"Success!":
+                            log_success(line)
+                        else:
+                            log_info(line)
+                    
+                    if not chunk:
+                        break
+                
+                process.stdout.close()
             
             process.wait()
             
             if process.returncode == 0:
                 self.logger.success("CS:GO server installation complete!")
                 
+                if validate:
+                    self._write_validate_stamp()
+                
                 # Fix bundled library issues on Linux
                 if self.sys_info.os_type == OSType.LINUX:
                     self._fix_bundled_libraries()
@@ -223,6 +364,22 @@ class CSGOInstaller:
             self.logger.error(f"Installation error: {e}")
             return False
     
+    def _validated_recently(self) -> bool:
+        """Check whether the validate stamp is younger than VALIDATE_MAX_AGE_DAYS"""
+        try:
+            age = time.time() - (self.install_dir / self.VALIDATE_STAMP).stat().st_mtime
+        except OSError:
+            return False
+        
+        return age < self.VALIDATE_MAX_AGE_DAYS * 86400
+    
+    def _write_validate_stamp(self):
+        """Record a successful validate in the install directory"""
+        try:
+            (self.install_dir / self.VALIDATE_STAMP).write_text(f"{int(time.time())}\n")
+        except OSError as e:
+            self.logger.debug(f"Could not write validate stamp: {e}")
+    
     def _fix_bundled_libraries(self) -> bool:
         """
         Fix bundled library conflicts on Linux
@@ -235,30 +392,33 @@ class CSGOInstaller:
         """
         self.logger.info("Fixing bundled library conflicts...")
         
-        bin_dir = self.install_dir / "bin"
-        if not bin_dir.exists():
-            self.logger.debug("bin directory not found, skipping library fix")
-            return True
-        
         # Libraries to rename (force use of system versions)
         libs_to_fix = [
             "libgcc_s.so.1",
             "libstdc++.so.6"
         ]
         
+        # One listing of bin/ instead of a stat per library
+        try:
+            with os.scandir(self.install_dir / "bin") as it:
+                present = {entry.name: entry.path for entry in it if entry.name in libs_to_fix}
+        except (FileNotFoundError, NotADirectoryError):
+            self.logger.debug("bin directory not found, skipping library fix")
+            return True
+        
         fixed_count = 0
         for lib in libs_to_fix:
-            lib_path = bin_dir / lib
-            if lib_path.exists():
-                backup_path = bin_dir / f"{lib}.bak"
-                try:
-                    lib_path.rename(backup_path)
-                    self.logger.debug(f"Renamed {lib} -> {lib}.bak")
-                    fixed_count += 1
-                except Exception as e:
-                    self.logger.warning(f"Could not rename {lib}: {e}")
-            else:
+            lib_path = present.get(lib)
+            if lib_path is None:
                 self.logger.debug(f"{lib} not found, no fix needed")
+                continue
+            
+            try:
+                os.replace(lib_path, f"{lib_path}.bak")
+                self.logger.debug(f"Renamed {lib} -> {lib}.bak")
+                fixed_count += 1
+            except OSError as e:
+                self.logger.warning(f"Could not rename {lib}: {e}")
         
         if fixed_count > 0:
             self.logger.success(f"Fixed {fixed_count} bundled library conflict(s)")
@@ -277,6 +437,62 @@ class CSGOInstaller:
         
         return server_exe.exists()
     
+    def current_buildid(self) -> Optional[str]:
+        """
+        Get the build ID of the installed server from its app manifest
+        
+        Returns:
+            Build ID, or None if the manifest is missing or has none
+        """
+        manifest = self.install_dir / "steamapps" / f"appmanifest_{self.CSGO_APP_ID}.acf"
+        try:
+            match = _BUILDID_RE.search(manifest.read_text(errors='replace'))
+        except OSError:
+            return None
+        
+        return match.group(1) if match else None
+    
+    def _load_buildid_cache(self) -> dict:
+        """Load the last-seen build IDs (install dir -> build ID)"""
+        try:
+            with open(get_cache_dir() / "csgo_buildid.json", "r") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def is_up_to_date(self) -> bool:
+        """
+        Check if the installed server is at the build last installed by setup
+        
+        Returns:
+            True if installed and the manifest build ID matches the cached one
+        """
+        if not self.is_installed():
+            return False
+        
+        buildid = self.current_buildid()
+        return buildid is not None and self._load_buildid_cache().get(self._install_dir_str) == buildid
+    
+    def remember_buildid(self):
+        """Cache the installed build ID so the next run can skip SteamCMD"""
+        buildid = self.current_buildid()
+        if buildid is None:
+            return
+        
+        cache = self._load_buildid_cache()
+        cache[self._install_dir_str] = buildid
+        
+        try:
+            cache_dir = get_cache_dir()
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_dir / "csgo_buildid.json.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_dir / "csgo_buildid.json")
+        except OSError as e:
+            self.logger.debug(f"Could not write build ID cache: {e}")
+    
     def get_install_dir(self) -> Path:
         """Get the server installation directory"""
         return self.install_dir
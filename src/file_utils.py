@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+File system helpers shared by the installers and scripts
+"""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import List
+
+
+# Buffer size for streaming downloads and archive members
+COPY_BUFSIZE = 1024 * 1024
+
+
+def makedirs_once(path: str, created_dirs: set):
+    """
+    Create path and its parents unless this pass already created it
+    
+    makedirs creates every missing ancestor too, so all of them are recorded
+    and sibling directories further up the tree skip the syscall as well.
+    """
+    if path in created_dirs:
+        return
+    
+    os.makedirs(path, exist_ok=True)
+    while path not in created_dirs:
+        created_dirs.add(path)
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+
+
+def extract_zip(zip_ref, dest: str) -> List[str]:
+    """
+    Extract a ZIP archive into dest
+    
+    Each destination directory is created once, and members that would land
+    outside dest (absolute paths, "..") are skipped like extractall does.
+    
+    Returns:
+        Paths of the extracted files
+    """
+    dest = os.path.abspath(dest)
+    created_dirs = set()
+    extracted = []
+    
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        
+        target = os.path.normpath(os.path.join(dest, info.filename))
+        if not target.startswith(dest + os.sep):
+            continue
+        
+        makedirs_once(os.path.dirname(target), created_dirs)
+        
+        with zip_ref.open(info) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFSIZE)
+        extracted.append(target)
+    
+    return extracted
+
+
+def remove_tree(path: Path):
+    """
+    Delete a directory tree (used for temporary plugin clones)
+    
+    On POSIX this hands the tree to `rm -rf`, which unlinks a large checkout
+    much faster than shutil.rmtree's per-file Python calls.
+    """
+    if os.name == 'posix':
+        subprocess.run(['rm', '-rf', '--', str(path)], check=False)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
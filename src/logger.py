@@ -5,8 +5,10 @@ Provides colored console output and file logging
 """
 
 import logging
+import logging.handlers
+import os
 import sys
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -24,13 +26,41 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'        # Reset
     }
     
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None):
+        super().__init__(fmt, datefmt)
+        
+        # Pre-render the padded, colored level names once
+        self._colored_levelnames = {}
+        if sys.platform != 'win32' or 'ANSICON' in os.environ:
+            reset = self.COLORS['RESET']
+            for levelname, color in self.COLORS.items():
+                if levelname != 'RESET':
+                    self._colored_levelnames[levelname] = f"{color}{levelname:<8}{reset}"
+    
     def format(self, record):
-        # Add color to levelname
-        if sys.platform != 'win32' or 'ANSICON' in sys.environ:
-            levelname = record.levelname
-            if levelname in self.COLORS:
-                record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        # Add color to levelname (restored afterwards so other handlers
+        # such as the log file don't receive the escape codes)
+        levelname = record.levelname
+        colored = self._colored_levelnames.get(levelname)
+        if colored is None:
+            return super().format(record)
+        
+        record.levelname = colored
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+class DeferredFileHandler(logging.FileHandler):
+    """FileHandler that creates its directory when the file is first opened"""
+    
+    def __init__(self, filename, encoding: Optional[str] = None):
+        super().__init__(filename, encoding=encoding, delay=True)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 
 class SetupLogger:
@@ -38,10 +68,9 @@ class SetupLogger:
     
     def __init__(self, log_dir: str = "logs"):
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
         
-        # Create timestamped log file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Timestamped log file (created on the first record that reaches it)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         self.log_file = self.log_dir / f"setup_{timestamp}.log"
         
         # Setup logger
@@ -60,7 +89,7 @@ class SetupLogger:
         console_handler.setFormatter(console_format)
         
         # File handler without colors
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        file_handler = DeferredFileHandler(self.log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_format = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(message)s',
@@ -68,9 +97,24 @@ class SetupLogger:
         )
         file_handler.setFormatter(file_format)
         
+        # Buffer file records and write them in batches
+        # (flushed immediately on warnings/errors and at exit)
+        buffered_file_handler = logging.handlers.MemoryHandler(
+            capacity=512,
+            flushLevel=logging.WARNING,
+            target=file_handler
+        )
+        buffered_file_handler.setLevel(logging.DEBUG)
+        
         # Add handlers
         self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+        self.logger.addHandler(buffered_file_handler)
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """Check if a message at this level would reach any handler"""
+        if not self.logger.isEnabledFor(level):
+            return False
+        return any(level >= handler.level for handler in self.logger.handlers)
     
     def debug(self, msg: str):
         """Log debug message"""
@@ -82,7 +126,7 @@ class SetupLogger:
     
     def success(self, msg: str):
         """Log success message (INFO level with ✓ prefix)"""
-        self.logger.info(f"✓ {msg}")
+        self.logger.info("✓ %s", msg)
     
     def warning(self, msg: str):
         """Log warning message"""
@@ -100,7 +144,7 @@ class SetupLogger:
         """Log a section header"""
         separator = "=" * 60
         self.logger.info(separator)
-        self.logger.info(f"  {title}")
+        self.logger.info("  %s", title)
         self.logger.info(separator)
 
 
@@ -4,14 +4,94 @@ Metamod:Source and SourceMod installation module
 Handles downloading and installing metamod and sourcemod to CS:GO server
 """
 
-import urllib.request
+import contextlib
+import hashlib
+import http.client
+import io
+import logging
+import mmap
+import os
+import subprocess
+import tarfile
+import tempfile
+import threading
 import zipfile
 import shutil
+import socket
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from urllib.parse import urljoin, urlsplit
+from typing import Callable, Dict, List, Optional, Tuple
 from logger import get_logger
 from system_detect import SystemInfo, OSType
 
+# Optional: ISA-L's gzip decoder, several times faster than zlib
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+
+# Archive entries smaller than this are read and written in one go; larger
+# ones are copied through a 1 MiB buffer that each thread allocates once
+_SMALL_ENTRY_SIZE = 64 * 1024
+_COPY_BUFFER_SIZE = 1 << 20
+_copy_buffers = threading.local()
+
+# tarfile's "data" extraction filter (Python 3.12, backported to 3.8.17+)
+# refuses links that point outside the destination
+_TAR_EXTRACT_ARGS = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+
+
+def _copy_entry(src, dst, size: int):
+    """
+    Copy an archive entry to an open file
+    
+    Args:
+        src: Readable entry stream
+        dst: Destination file
+        size: Uncompressed size of the entry
+    """
+    if size < _SMALL_ENTRY_SIZE:
+        dst.write(src.read())
+        return
+    
+    view = getattr(_copy_buffers, "view", None)
+    if view is None:
+        view = _copy_buffers.view = memoryview(bytearray(_COPY_BUFFER_SIZE))
+    
+    while True:
+        n = src.readinto(view)
+        if not n:
+            break
+        dst.write(view[:n])
+
+
+class _MappedArchive(mmap.mmap):
+    """Read-only memory map that zipfile accepts as an archive file"""
+    
+    def seekable(self) -> bool:
+        # zipfile asks for this; mmap only has it from Python 3.13
+        return True
+
+
+class _HashingReader:
+    """Read-through stream wrapper that feeds everything read into a SHA-256 hash"""
+    
+    def __init__(self, src, sha256=None):
+        self.src = src
+        self.sha256 = sha256 if sha256 is not None else hashlib.sha256()
+    
+    def read(self, size: Optional[int] = None) -> bytes:
+        # HTTPResponse.read(-1) waits for the connection to close, so "read
+        # everything" is passed on as a plain read()
+        if size is None or size < 0:
+            data = self.src.read()
+        else:
+            data = self.src.read(size)
+        self.sha256.update(data)
+        return data
+
 
 class MetamodSourcemodInstaller:
     """Handles installation of Metamod:Source and SourceMod"""
@@ -24,6 +104,23 @@ class MetamodSourcemodInstaller:
     SOURCEMOD_URL = "https://sm.alliedmods.net/smdrop/1.11/sourcemod-1.11.0-git6968-linux.tar.gz"
     SOURCEMOD_URL_WIN = "https://sm.alliedmods.net/smdrop/1.11/sourcemod-1.11.0-git6968-windows.zip"
     
+    # Download settings
+    HTTP_HEADERS = {"User-Agent": "VileHvH-Installer"}
+    HTTP_TIMEOUT = 60
+    MAX_REDIRECTS = 5
+    DOWNLOAD_ATTEMPTS = 3
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+    
+    # Pinned SHA-256 digests of the archives, by URL. Downloads of pinned
+    # URLs are verified; for any other URL the digest is only logged.
+    ARCHIVE_SHA256: Dict[str, str] = {}
+    
+    # Downloaded archives up to this size are kept in memory
+    MEMORY_ARCHIVE_MAX = 64 * 1024 * 1024
+    
+    # Threads writing extracted files
+    EXTRACT_WORKERS = 8
+    
     def __init__(self, sys_info: SystemInfo, csgo_install_dir: Path):
         self.sys_info = sys_info
         self.csgo_install_dir = csgo_install_dir
@@ -43,6 +140,459 @@ class MetamodSourcemodInstaller:
             self.metamod_url = self.METAMOD_URL
             self.sourcemod_url = self.SOURCEMOD_URL
             self.archive_ext = ".tar.gz"
+        
+        # Idle keep-alive connections by (scheme, host), reused across downloads
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        
+        # Archives being downloaded ahead of time, by URL
+        self._prefetched = {}
+        
+        # Cached install checks (None = not checked since the last extraction)
+        self._mm_installed: Optional[bool] = None
+        self._sm_installed: Optional[bool] = None
+    
+    def _new_connection(self, key: tuple) -> http.client.HTTPConnection:
+        """Open a new connection for a (scheme, host) pair"""
+        scheme, netloc = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.HTTP_TIMEOUT)
+        return http.client.HTTPConnection(netloc, timeout=self.HTTP_TIMEOUT)
+    
+    def _send(self, key: tuple, path: str, headers: dict):
+        """
+        Send a GET request, reusing an idle connection to the host if there is one
+        
+        Returns:
+            (connection, response) tuple
+        """
+        with self._connections_lock:
+            conn = self._connections.pop(key, None)
+        reused = conn is not None
+        if conn is None:
+            conn = self._new_connection(key)
+        
+        try:
+            conn.request("GET", path, headers=headers)
+            return conn, conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        
+        # The server dropped the idle connection, retry once on a fresh one
+        conn = self._new_connection(key)
+        conn.request("GET", path, headers=headers)
+        return conn, conn.getresponse()
+    
+    def _release(self, key: tuple, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse):
+        """Keep a connection for reuse if its response was read to the end, close it otherwise"""
+        if resp.isclosed() and not resp.will_close and not resp.length:
+            with self._connections_lock:
+                old = self._connections.pop(key, None)
+                self._connections[key] = conn
+            if old is not None:
+                old.close()
+        else:
+            conn.close()
+    
+    def close_connections(self):
+        """Close all idle keep-alive connections"""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+    
+    @contextlib.contextmanager
+    def _get(self, url: str, offset: int = 0):
+        """
+        GET a URL over a kept-alive connection, following redirects
+        
+        Args:
+            url: URL to fetch
+            offset: Byte offset to resume from; the server may answer with
+                the rest of the file (206) or the whole file (200)
+        
+        Yields:
+            The HTTP response; its connection is kept for reuse once the
+            body has been read completely
+        """
+        headers = self.HTTP_HEADERS
+        if offset:
+            headers = {**headers, "Range": f"bytes={offset}-"}
+        
+        for _ in range(self.MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            key = (parts.scheme, parts.netloc)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            
+            conn, resp = self._send(key, path, headers)
+            
+            location = resp.getheader("Location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                resp.read()
+                self._release(key, conn, resp)
+                url = urljoin(url, location)
+                continue
+            
+            if resp.status != 200 and not (offset and resp.status == 206):
+                conn.close()
+                raise OSError(f"HTTP {resp.status} {resp.reason} for {url}")
+            
+            try:
+                yield resp
+            finally:
+                self._release(key, conn, resp)
+            return
+        
+        raise OSError(f"Too many redirects for {url}")
+    
+    def _fetch(self, url: str):
+        """
+        Download an archive into memory, or an anonymous temp file if it's large
+        
+        Args:
+            url: Archive URL
+        
+        An interrupted transfer is resumed with a Range request from the last
+        byte received, up to DOWNLOAD_ATTEMPTS times in total.
+        
+        Returns:
+            A seekable file object positioned at the start
+        
+        Raises:
+            ValueError: If the archive doesn't match its pinned SHA-256
+        """
+        archive = None
+        sha256 = None
+        
+        try:
+            for attempt in range(1, self.DOWNLOAD_ATTEMPTS + 1):
+                offset = archive.tell() if archive is not None else 0
+                try:
+                    with self._get(url, offset) as resp:
+                        if archive is None:
+                            length = resp.getheader("Content-Length")
+                            if length is not None and int(length) <= self.MEMORY_ARCHIVE_MAX:
+                                archive = io.BytesIO()
+                            else:
+                                archive = tempfile.TemporaryFile()
+                                if length is not None and hasattr(os, "posix_fallocate"):
+                                    # Reserve the space up front instead of growing
+                                    # the file one chunk at a time
+                                    try:
+                                        os.posix_fallocate(archive.fileno(), 0, int(length))
+                                    except OSError:
+                                        pass
+                        
+                        if resp.status != 206:
+                            # Whole file (first attempt, or Range not supported)
+                            if offset:
+                                # A retry the server answered from the start:
+                                # drop the partial data. Not done on the first
+                                # attempt, where it would also free the
+                                # fallocate'd space
+                                archive.seek(0)
+                                archive.truncate()
+                            sha256 = hashlib.sha256()
+                        
+                        reader = _HashingReader(resp, sha256)
+                        shutil.copyfileobj(reader, archive, self.DOWNLOAD_CHUNK_SIZE)
+                        
+                        # read(n) just returns short at EOF, so a connection
+                        # closed before Content-Length bytes arrived is caught here
+                        if resp.length:
+                            raise http.client.IncompleteRead(b"", resp.length)
+                    break
+                
+                except (http.client.IncompleteRead, ConnectionError, socket.timeout) as e:
+                    if archive is None or attempt == self.DOWNLOAD_ATTEMPTS:
+                        raise
+                    self.logger.warning(f"Download interrupted ({e}), resuming at byte {archive.tell()}...")
+            
+            self._verify_digest(url, sha256)
+        
+        except BaseException:
+            if archive is not None:
+                archive.close()
+            raise
+        
+        archive.seek(0)
+        return archive
+    
+    def _verify_digest(self, url: str, sha256):
+        """
+        Check a download's SHA-256 against ARCHIVE_SHA256
+        
+        Args:
+            url: URL the archive was downloaded from
+            sha256: hashlib object fed with the downloaded bytes
+        
+        Raises:
+            ValueError: If the URL has a pinned digest and it doesn't match
+        """
+        expected = self.ARCHIVE_SHA256.get(url)
+        
+        if expected is None:
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.debug(f"SHA-256 of {url}: {sha256.hexdigest()}")
+            return
+        
+        digest = sha256.hexdigest()
+        if digest != expected.lower():
+            raise ValueError(f"SHA-256 mismatch for {url}: expected {expected}, got {digest}")
+    
+    @staticmethod
+    def _discard_prefetch(future: Future):
+        """Close the temp file of a prefetched archive that was never used"""
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+    
+    @staticmethod
+    def _member_path(dest: str, name: str) -> str:
+        """Path of an archive member under dest (absolute paths and '..' are refused)"""
+        parts = name.replace("\\", "/").split("/")
+        if name.startswith(("/", "\\")) or ".." in parts or ":" in parts[0]:
+            raise ValueError(f"Unsafe path in archive: {name}")
+        return os.path.join(dest, *[part for part in parts if part and part != "."])
+    
+    def _parallel_extract(self, archive, dest: Path):
+        """
+        Extract a tar or zip archive, writing the files from a thread pool
+        
+        Tar members are read in order on the calling thread (a streamed tar
+        can't be read out of order); zip entries are read by the workers.
+        Either way the per-file open/write/chmod calls for SourceMod's
+        thousands of small files overlap. Each directory is created once and
+        modification times are not restored. Links must point inside dest,
+        and once one has been extracted every later member's resolved path
+        is checked too, so nothing can be written through a link.
+        
+        Args:
+            archive: Open tarfile.TarFile or zipfile.ZipFile
+            dest: Directory to extract into
+        """
+        # The extraction changes addons/, so the install checks must re-run
+        self._mm_installed = None
+        self._sm_installed = None
+        
+        dest = str(dest)
+        dest_real = os.path.realpath(dest)
+        created_dirs = set()
+        has_links = False
+        
+        def inside_dest(path):
+            real = os.path.realpath(path)
+            return real == dest_real or real.startswith(dest_real + os.sep)
+        
+        def ensure_dir(path):
+            # Racing workers at worst repeat an exist_ok makedirs
+            if path not in created_dirs:
+                os.makedirs(path, exist_ok=True)
+                created_dirs.add(path)
+        
+        def write_file(path, data, mode):
+            ensure_dir(os.path.dirname(path))
+            with open(path, 'wb') as f:
+                f.write(data)
+            os.chmod(path, mode)
+        
+        def copy_zip_entry(info, path):
+            ensure_dir(os.path.dirname(path))
+            with archive.open(info) as src, open(path, 'wb') as dst:
+                _copy_entry(src, dst, info.file_size)
+        
+        with ThreadPoolExecutor(max_workers=self.EXTRACT_WORKERS) as executor:
+            pending = set()
+            
+            def drain(limit):
+                # Wait until at most `limit` writes are in flight, raising any error
+                nonlocal pending
+                while len(pending) > limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            
+            if isinstance(archive, zipfile.ZipFile):
+                for info in archive.infolist():
+                    path = self._member_path(dest, info.filename)
+                    if info.is_dir():
+                        ensure_dir(path)
+                    else:
+                        pending.add(executor.submit(copy_zip_entry, info, path))
+            else:
+                for member in archive:
+                    path = self._member_path(dest, member.name)
+                    if has_links and not inside_dest(path):
+                        raise ValueError(f"Unsafe path in archive: {member.name}")
+                    
+                    if member.isdir():
+                        ensure_dir(path)
+                    elif member.isreg() and member.size < _SMALL_ENTRY_SIZE:
+                        # Bound the file data held by queued writes
+                        drain(self.EXTRACT_WORKERS * 4)
+                        data = archive.extractfile(member).read()
+                        pending.add(executor.submit(write_file, path, data, member.mode & 0o7777))
+                    elif member.isreg():
+                        # Large files are streamed here rather than held in memory
+                        ensure_dir(os.path.dirname(path))
+                        with open(path, 'wb') as dst:
+                            _copy_entry(archive.extractfile(member), dst, member.size)
+                        os.chmod(path, member.mode & 0o7777)
+                    else:
+                        # Links and special files are left to tarfile, after
+                        # the files they may point at have been written
+                        if member.issym() or member.islnk():
+                            if member.issym():
+                                target = os.path.join(os.path.dirname(path), member.linkname)
+                            else:
+                                target = os.path.join(dest, member.linkname)
+                            if not inside_dest(target):
+                                raise ValueError(f"Unsafe link in archive: {member.name} -> {member.linkname}")
+                            has_links = True
+                        drain(0)
+                        archive.extract(member, dest, set_attrs=False, **_TAR_EXTRACT_ARGS)
+            
+            drain(0)
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def _map_archive(archive):
+        """
+        Memory-map a downloaded archive that was staged in a temp file
+        
+        zipfile seeks and reads all over the archive (central directory, then
+        every entry header); with a mapping those reads are memory copies
+        instead of syscalls. Archives already in memory are used as they are.
+        
+        Args:
+            archive: File object returned by _fetch
+        
+        Yields:
+            A seekable, readable view of the archive
+        """
+        if isinstance(archive, io.BytesIO):
+            yield archive
+            return
+        
+        mapped = _MappedArchive(archive.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+    
+    @contextlib.contextmanager
+    def _open_tarball(self, fileobj):
+        """
+        Open a .tar.gz stream for sequential reading
+        
+        Decompression uses isal's igzip if it is installed, otherwise pigz if
+        it is on PATH, otherwise tarfile's own zlib decoder.
+        
+        Args:
+            fileobj: Readable stream of the compressed archive
+        
+        Yields:
+            tarfile.TarFile in stream mode
+        """
+        if igzip is not None:
+            with igzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+                with tarfile.open(fileobj=gz, mode='r|') as tar:
+                    yield tar
+            return
+        
+        pigz = shutil.which("pigz")
+        if pigz is None:
+            with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+                yield tar
+            return
+        
+        proc = subprocess.Popen(
+            [pigz, "-dc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        feed_errors = []
+        
+        def feed():
+            try:
+                shutil.copyfileobj(fileobj, proc.stdin, self.DOWNLOAD_CHUNK_SIZE)
+                proc.stdin.close()
+            except BrokenPipeError:
+                # pigz exited early; its status is checked below
+                pass
+            except Exception as e:
+                feed_errors.append(e)
+                proc.kill()
+        
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        
+        try:
+            with tarfile.open(fileobj=proc.stdout, mode='r|') as tar:
+                yield tar
+            
+            # Read past the end-of-archive padding so pigz can exit cleanly
+            while proc.stdout.read(self.DOWNLOAD_CHUNK_SIZE):
+                pass
+        finally:
+            proc.stdout.close()
+            feeder.join()
+            returncode = proc.wait()
+        
+        if feed_errors:
+            raise feed_errors[0]
+        if returncode != 0:
+            raise OSError(f"pigz exited with status {returncode}")
+    
+    def _download_and_extract(self, url: str):
+        """
+        Download an archive and extract it into the csgo directory
+        
+        Tarballs are extracted straight from the HTTP response, so decompression
+        overlaps the download. Zip archives need random access, and archives
+        with a pinned SHA-256 must be verified before anything is extracted,
+        so those are downloaded first (see _fetch). Nothing is written to a
+        fixed temp path.
+        
+        Args:
+            url: Archive URL
+        """
+        # Archive already downloaded (or downloading) in the background
+        prefetch = self._prefetched.pop(url, None)
+        if prefetch is not None:
+            archive = prefetch.result()
+        elif self.archive_ext == ".zip" or url in self.ARCHIVE_SHA256:
+            archive = self._fetch(url)
+        else:
+            archive = None
+        
+        if archive is not None:
+            with archive:
+                if self.archive_ext == ".zip":
+                    with self._map_archive(archive) as source, zipfile.ZipFile(source, 'r') as zip_ref:
+                        self._parallel_extract(zip_ref, self.csgo_dir)
+                else:
+                    with self._open_tarball(archive) as tar:
+                        self._parallel_extract(tar, self.csgo_dir)
+            return
+        
+        # Unpinned URL: the stream is hashed as it is extracted and the
+        # digest is only logged
+        with self._get(url) as resp:
+            reader = _HashingReader(resp)
+            with self._open_tarball(reader) as tar:
+                self._parallel_extract(tar, self.csgo_dir)
+            
+            # Drain any padding after the end of the archive so the
+            # connection can be reused
+            reader.read()
+        
+        self._verify_digest(url, reader.sha256)
     
     def check_prerequisites(self) -> bool:
         """Check if CS:GO server is installed"""
@@ -52,83 +602,106 @@ class MetamodSourcemodInstaller:
             return False
         return True
     
+    def _scan_addons(self):
+        """List the addons directory once and fill both cached install checks"""
+        try:
+            with os.scandir(self.addons_dir) as it:
+                names = {entry.name for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            names = set()
+        
+        self._mm_installed = "metamod.vdf" in names or "metamod" in names
+        self._sm_installed = "sourcemod" in names
+    
     def is_metamod_installed(self) -> bool:
-        """Check if Metamod:Source is installed"""
-        metamod_vdf = self.addons_dir / "metamod.vdf"
-        metamod_bin = self.addons_dir / "metamod"
-        return metamod_vdf.exists() or metamod_bin.exists()
+        """Check if Metamod:Source is installed (cached until the next extraction)"""
+        if self._mm_installed is None:
+            self._scan_addons()
+        return self._mm_installed
     
     def is_sourcemod_installed(self) -> bool:
-        """Check if SourceMod is installed"""
-        sourcemod_dir = self.addons_dir / "sourcemod"
-        return sourcemod_dir.exists()
+        """Check if SourceMod is installed (cached until the next extraction)"""
+        if self._sm_installed is None:
+            self._scan_addons()
+        return self._sm_installed
     
-    def install_metamod(self, force: bool = False) -> bool:
+    def _install_archive(
+        self,
+        name: str,
+        url: str,
+        installed_check: Callable[[], bool],
+        post_install: Optional[Callable[[], object]] = None,
+        requires_metamod: bool = False,
+        force: bool = False
+    ) -> bool:
         """
-        Install Metamod:Source
+        Download, extract and verify one of the archives
         
         Args:
+            name: Display name (e.g. "SourceMod")
+            url: Archive URL
+            installed_check: Returns True if the package is installed
+            post_install: Called after the installation has been verified
+            requires_metamod: Refuse to install unless Metamod:Source is present
             force: Force reinstall even if already installed
         
         Returns:
             True if successful, False otherwise
         """
-        self.logger.section("Installing Metamod:Source")
+        self.logger.section(f"Installing {name}")
         
         if not self.check_prerequisites():
             return False
         
-        if self.is_metamod_installed() and not force:
-            self.logger.info("Metamod:Source is already installed")
+        if requires_metamod and not self.is_metamod_installed():
+            self.logger.error(f"Metamod:Source must be installed before {name}")
+            return False
+        
+        if installed_check() and not force:
+            self.logger.info(f"{name} is already installed")
             return True
         
         # Create addons directory
         self.addons_dir.mkdir(parents=True, exist_ok=True)
         
-        # Download Metamod
-        temp_file = Path(f"/tmp/metamod{self.archive_ext}")
-        
-        self.logger.info(f"Downloading Metamod:Source from {self.metamod_url}...")
+        # Download and extract
+        self.logger.info(f"Downloading {name} from {url}...")
         try:
-            urllib.request.urlretrieve(self.metamod_url, temp_file)
-            self.logger.success("Download complete")
+            self._download_and_extract(url)
+            self.logger.success(f"{name} downloaded and extracted successfully")
         except Exception as e:
-            self.logger.error(f"Failed to download Metamod:Source: {e}")
+            self.logger.error(f"Failed to download/extract {name}: {e}")
             self.logger.warning("Please check if the URL is still valid")
             return False
         
-        # Extract archive
-        self.logger.info("Extracting Metamod:Source...")
-        try:
-            if self.archive_ext == ".zip":
-                with zipfile.ZipFile(temp_file, 'r') as zip_ref:
-                    zip_ref.extractall(self.csgo_dir)
-            else:
-                import tarfile
-                with tarfile.open(temp_file, 'r:gz') as tar:
-                    tar.extractall(self.csgo_dir)
-            
-            self.logger.success("Metamod:Source extracted successfully")
+        # Verify installation
+        if installed_check():
+            self.logger.success(f"{name} installation verified")
             
-            # Clean up temp file
-            temp_file.unlink()
+            if post_install is not None:
+                post_install()
             
-            # Verify installation
-            if self.is_metamod_installed():
-                self.logger.success("Metamod:Source installation verified")
-                
-                # Fix 32-bit/64-bit issue on Linux
-                self._fix_metamod_architecture()
-                
-                return True
-            else:
-                self.logger.error("Metamod:Source installation verification failed")
-                return False
-        
-        except Exception as e:
-            self.logger.error(f"Failed to extract Metamod:Source: {e}")
+            return True
+        else:
+            self.logger.error(f"{name} installation verification failed")
             return False
     
+    def install_metamod(self, force: bool = False) -> bool:
+        """
+        Install Metamod:Source
+        
+        Args:
+            force: Force reinstall even if already installed
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        # Fixes the 32-bit/64-bit issue on Linux once installed
+        return self._install_archive(
+            "Metamod:Source", self.metamod_url, self.is_metamod_installed,
+            post_install=self._fix_metamod_architecture, force=force
+        )
+    
     def _fix_metamod_architecture(self) -> bool:
         """
         Fix Metamod architecture issue
@@ -154,13 +727,22 @@ class MetamodSourcemodInstaller:
             if linux32_dir.exists():
                 self.logger.info("Fixing Metamod architecture (32-bit required)...")
                 try:
-                    # Remove the 64-bit directory
-                    import shutil
-                    shutil.rmtree(linux64_dir)
+                    # Move the 64-bit directory out of the way (a single
+                    # rename, however many files it holds)
+                    trash_dir = Path(tempfile.mkdtemp(prefix="linux64.unused.", dir=metamod_bin))
+                    linux64_dir.rename(trash_dir / "linux64")
                     
                     # Create symlink: linux64 -> linux32
                     linux64_dir.symlink_to("linux32")
                     
+                    # Delete the old directory without holding up the install
+                    # (not a daemon thread, so it still finishes before exit)
+                    threading.Thread(
+                        target=shutil.rmtree,
+                        args=(trash_dir,),
+                        kwargs={"ignore_errors": True}
+                    ).start()
+                    
                     self.logger.success("Metamod configured to use 32-bit binaries")
                     return True
                 except Exception as e:
@@ -183,58 +765,10 @@ class MetamodSourcemodInstaller:
         Returns:
             True if successful, False otherwise
         """
-        self.logger.section("Installing SourceMod")
-        
-        if not self.check_prerequisites():
-            return False
-        
-        if not self.is_metamod_installed():
-            self.logger.error("Metamod:Source must be installed before SourceMod")
-            return False
-        
-        if self.is_sourcemod_installed() and not force:
-            self.logger.info("SourceMod is already installed")
-            return True
-        
-        # Download SourceMod
-        temp_file = Path(f"/tmp/sourcemod{self.archive_ext}")
-        
-        self.logger.info(f"Downloading SourceMod from {self.sourcemod_url}...")
-        try:
-            urllib.request.urlretrieve(self.sourcemod_url, temp_file)
-            self.logger.success("Download complete")
-        except Exception as e:
-            self.logger.error(f"Failed to download SourceMod: {e}")
-            self.logger.warning("Please check if the URL is still valid")
-            return False
-        
-        # Extract archive
-        self.logger.info("Extracting SourceMod...")
-        try:
-            if self.archive_ext == ".zip":
-                with zipfile.ZipFile(temp_file, 'r') as zip_ref:
-                    zip_ref.extractall(self.csgo_dir)
-            else:
-                import tarfile
-                with tarfile.open(temp_file, 'r:gz') as tar:
-                    tar.extractall(self.csgo_dir)
-            
-            self.logger.success("SourceMod extracted successfully")
-            
-            # Clean up temp file
-            temp_file.unlink()
-            
-            # Verify installation
-            if self.is_sourcemod_installed():
-                self.logger.success("SourceMod installation verified")
-                return True
-            else:
-                self.logger.error("SourceMod installation verification failed")
-                return False
-        
-        except Exception as e:
-            self.logger.error(f"Failed to extract SourceMod: {e}")
-            return False
+        return self._install_archive(
+            "SourceMod", self.sourcemod_url, self.is_sourcemod_installed,
+            requires_metamod=True, force=force
+        )
     
     def install_all(self, force: bool = False) -> bool:
         """
@@ -248,13 +782,27 @@ class MetamodSourcemodInstaller:
         """
         self.logger.section("Installing Metamod:Source and SourceMod")
         
-        # Install Metamod first
-        if not self.install_metamod(force):
-            return False
+        # SourceMod only has to be extracted after Metamod, so its download
+        # runs in the background while Metamod is installed
+        executor = ThreadPoolExecutor(max_workers=1)
+        if force or not self.is_sourcemod_installed():
+            self._prefetched[self.sourcemod_url] = executor.submit(self._fetch, self.sourcemod_url)
         
-        # Then install SourceMod
-        if not self.install_sourcemod(force):
-            return False
+        try:
+            # Install Metamod first
+            if not self.install_metamod(force):
+                return False
+            
+            # Then install SourceMod
+            if not self.install_sourcemod(force):
+                return False
+        finally:
+            # Don't wait on a download that is no longer needed
+            leftover = self._prefetched.pop(self.sourcemod_url, None)
+            if leftover is not None:
+                leftover.add_done_callback(self._discard_prefetch)
+            executor.shutdown(wait=False)
+            self.close_connections()
         
         self.logger.success("Metamod:Source and SourceMod installation complete!")
         return True
@@ -268,6 +816,18 @@ class MetamodSourcemodInstaller:
             admin_name: Display name for the admin
             flags: Admin flags (default "z" = root)
         
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.add_admins([(steam_id, admin_name, flags)])
+    
+    def add_admins(self, admins: List[Tuple[str, str, str]]) -> bool:
+        """
+        Add several admins to SourceMod admins_simple.ini in a single write
+        
+        Args:
+            admins: (steam_id, admin_name, flags) tuples
+        
         Returns:
             True if successful, False otherwise
         """
@@ -281,14 +841,18 @@ class MetamodSourcemodInstaller:
             self.logger.error(f"admins_simple.ini not found: {admins_file}")
             return False
         
-        # Add admin to file
-        admin_line = f'"{steam_id}" "{flags}" // {admin_name}\n'
+        # Add admins to file
+        payload = "".join(
+            f'"{steam_id}" "{flags}" // {admin_name}\n' for steam_id, admin_name, flags in admins
+        )
         
         try:
-            with open(admins_file, 'a') as f:
-                f.write(admin_line)
+            with open(admins_file, 'a', buffering=1 << 16) as f:
+                f.write(payload)
             
-            self.logger.success(f"Added admin: {admin_name} ({steam_id}) with flags '{flags}'")
+            if self.logger.is_enabled_for(logging.INFO):
+                for steam_id, admin_name, flags in admins:
+                    self.logger.success(f"Added admin: {admin_name} ({steam_id}) with flags '{flags}'")
             return True
         
         except Exception as e:
@@ -7,14 +7,84 @@ NOTE: This is a template/starter for future plugin management.
 The user will need to expand this with specific plugin logic for HvH-gg plugins, etc.
 """
 
-import urllib.request
+import errno
+import io
+import os
 import shutil
-import zipfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List
+from file_utils import COPY_BUFSIZE, extract_zip, makedirs_once
 from logger import get_logger
 
 
+def _iter_files(root: str):
+    """
+    Yield a DirEntry for every file below root
+    
+    Uses os.scandir so the file type comes from the directory listing
+    instead of a separate stat() per entry.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+
+def _copy_file_range(src: str, dst: str, size: int) -> bool:
+    """
+    Copy file data with os.copy_file_range so it never leaves the kernel
+    
+    Returns:
+        True if all size bytes were copied; False if copy_file_range is
+        unavailable, unsupported between the two filesystems, or stopped
+        short (e.g. the source shrank), so the caller can fall back
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+    
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            offset = 0
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset,
+                                            offset_src=offset, offset_dst=offset)
+                if copied == 0:
+                    break
+                offset += copied
+        finally:
+            os.close(dst_fd)
+    except OSError as e:
+        if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP):
+            raise
+        return False
+    finally:
+        os.close(src_fd)
+    
+    return offset == size
+
+
+def _copy_file(src: str, dst: str):
+    """
+    Copy a file with its permission bits and timestamps
+    
+    Unlike shutil.copy2 this skips xattrs and file flags, which plugin
+    files don't carry.
+    """
+    st = os.stat(src)
+    if not _copy_file_range(src, dst, st.st_size):
+        shutil.copyfile(src, dst)
+    os.chmod(dst, st.st_mode & 0o777)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
 class PluginManager:
     """Manages SourceMod plugins installation and updates"""
     
@@ -30,15 +100,67 @@ class PluginManager:
         self.gamedata_dir = self.sourcemod_dir / "gamedata"
         self.configs_dir = self.sourcemod_dir / "configs"
         self.translations_dir = self.sourcemod_dir / "translations"
+        
+        # Plain-string forms for the copy/rename/unlink helpers
+        self._addons_dir_str = os.fspath(self.addons_dir)
+        self._plugins_dir_str = os.fspath(self.plugins_dir)
+        
+        # False once os.rename has failed with EXDEV (plugin files on another
+        # filesystem, e.g. an overlay/bind mount); later renames then copy+unlink
+        self._rename_atomic: Optional[bool] = None
+        
+        # Set once SourceMod has been found (nothing here ever removes it)
+        self._sourcemod_installed = False
+        
+        # Installed plugin names, scanned on first listing and then kept
+        # up to date by the install/enable/disable/remove methods
+        self._installed_plugins: Optional[List[str]] = None
     
     def check_sourcemod_installed(self) -> bool:
         """Check if SourceMod is installed"""
+        if self._sourcemod_installed:
+            return True
+        
         if not self.sourcemod_dir.exists():
             self.logger.error("SourceMod is not installed")
             self.logger.error("Please install SourceMod first")
             return False
+        
+        self._sourcemod_installed = True
         return True
     
+    def _remember_plugin(self, plugin_name: str):
+        """Add a plugin to the cached listing (if it has been scanned)"""
+        if self._installed_plugins is not None and plugin_name not in self._installed_plugins:
+            self._installed_plugins.append(plugin_name)
+    
+    def _remember_plugins(self, paths: List[str]):
+        """Add the plugins among freshly written files to the cached listing"""
+        plugins_dir = os.path.abspath(self._plugins_dir_str)
+        for path in paths:
+            if path.endswith('.smx') and os.path.dirname(os.path.abspath(path)) == plugins_dir:
+                self._remember_plugin(os.path.basename(path))
+    
+    def _forget_plugin(self, plugin_name: str):
+        """Drop a plugin from the cached listing (if it has been scanned)"""
+        if self._installed_plugins is not None and plugin_name in self._installed_plugins:
+            self._installed_plugins.remove(plugin_name)
+    
+    def _rename(self, src: str, dst: str):
+        """Rename a plugin file, copying and unlinking across filesystems"""
+        if self._rename_atomic is not False:
+            try:
+                os.rename(src, dst)
+                self._rename_atomic = True
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                self._rename_atomic = False
+        
+        _copy_file(src, dst)
+        os.unlink(src)
+    
     def install_plugin_from_url(self, url: str, plugin_name: str) -> bool:
         """
         Download and install a plugin from a URL
@@ -55,33 +177,58 @@ class PluginManager:
         
         self.logger.info(f"Downloading plugin: {plugin_name}")
         
+        # Imported here so listing/enabling plugins doesn't pay for
+        # urllib.request (ssl, http.client, email) at startup
+        import http.client
+        import urllib.request
+        import zipfile
+        
         # Determine file type from URL
         is_zip = url.endswith('.zip')
-        temp_file = Path(f"/tmp/{plugin_name}{'zip' if is_zip else '.smx'}")
         
         try:
-            # Download file
-            urllib.request.urlretrieve(url, temp_file)
-            self.logger.success(f"Downloaded: {plugin_name}")
-            
-            if is_zip:
-                # Extract ZIP archive
-                # Most plugins follow this structure:
-                # addons/sourcemod/plugins/*.smx
-                # addons/sourcemod/scripting/*.sp
-                self.logger.info("Extracting plugin archive...")
-                with zipfile.ZipFile(temp_file, 'r') as zip_ref:
-                    # Extract to csgo directory (one level above addons)
-                    zip_ref.extractall(self.addons_dir.parent)
-                self.logger.success("Plugin extracted")
-            else:
-                # Copy .smx file to plugins directory
-                dest_file = self.plugins_dir / temp_file.name
-                shutil.copy(temp_file, dest_file)
-                self.logger.success(f"Plugin installed: {dest_file}")
+            with urllib.request.urlopen(url) as response:
+                if is_zip:
+                    # Download archive into memory (ZipFile needs a seekable file)
+                    archive = io.BytesIO()
+                    shutil.copyfileobj(response, archive, COPY_BUFSIZE)
+                    self.logger.success(f"Downloaded: {plugin_name}")
+                    
+                    # Extract ZIP archive
+                    # Most plugins follow this structure:
+                    # addons/sourcemod/plugins/*.smx
+                    # addons/sourcemod/scripting/*.sp
+                    self.logger.info("Extracting plugin archive...")
+                    with zipfile.ZipFile(archive, 'r') as zip_ref:
+                        # Extract to csgo directory (one level above addons)
+                        extracted = extract_zip(zip_ref, os.path.dirname(self._addons_dir_str))
+                    self._remember_plugins(extracted)
+                    self.logger.success("Plugin extracted")
+                else:
+                    # Stream .smx file into a temp file next to its final
+                    # name, so a failed download never leaves a truncated
+                    # plugin where SourceMod would load it
+                    dest_file = self.plugins_dir / f"{plugin_name}.smx"
+                    tmp = tempfile.NamedTemporaryFile(dir=self.plugins_dir, prefix=f".{plugin_name}.",
+                                                      suffix=".tmp", delete=False)
+                    try:
+                        with tmp:
+                            shutil.copyfileobj(response, tmp, COPY_BUFSIZE)
+                        
+                        # urllib returns short reads instead of raising when
+                        # the connection drops before Content-Length bytes
+                        if response.length:
+                            raise http.client.IncompleteRead(b"", response.length)
+                        
+                        os.chmod(tmp.name, 0o644)
+                        os.replace(tmp.name, dest_file)
+                    except BaseException:
+                        os.unlink(tmp.name)
+                        raise
+                    self.logger.success(f"Downloaded: {plugin_name}")
+                    self.logger.success(f"Plugin installed: {dest_file}")
+                    self._remember_plugin(dest_file.name)
             
-            # Clean up temp file
-            temp_file.unlink()
             return True
         
         except Exception as e:
@@ -117,23 +264,39 @@ class PluginManager:
         
         try:
             # Copy the entire addons structure
-            for item in plugin_addons.rglob("*"):
-                if item.is_file():
-                    # Calculate relative path from plugin_addons
-                    rel_path = item.relative_to(plugin_addons)
-                    dest_file = self.addons_dir / rel_path
-                    
-                    # Create destination directory if needed
-                    dest_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Copy file
-                    shutil.copy2(item, dest_file)
-                    self.logger.debug(f"Copied: {rel_path}")
+            src_root = os.fspath(plugin_addons)
+            base_len = len(src_root) + 1
+            created_dirs = set()
+            sources = []
+            destinations = []
+            
+            for entry in _iter_files(src_root):
+                # Relative path from plugin_addons
+                rel_path = entry.path[base_len:]
+                dest_file = os.path.join(self._addons_dir_str, rel_path)
+                
+                # Create destination directory if needed (once per directory)
+                makedirs_once(os.path.dirname(dest_file), created_dirs)
+                
+                sources.append(entry.path)
+                destinations.append(dest_file)
+            
+            # Copy files in parallel (the copies spend their time in syscalls)
+            workers = min(8, (os.cpu_count() or 1) * 2)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(_copy_file, sources, destinations):
+                    pass
+            
+            self.logger.debug(f"Copied {len(sources)} file(s) from {plugin_addons}")
+            
+            # Add the new plugins to the cached listing instead of rescanning
+            self._remember_plugins(destinations)
             
             self.logger.success(f"Plugin installed from {plugin_dir.name}")
             return True
         
         except Exception as e:
+            self._installed_plugins = None
             self.logger.error(f"Failed to install plugin: {e}")
             return False
     
@@ -166,19 +329,22 @@ class PluginManager:
         """
         List all installed plugins
         
+        The plugins directory is scanned once; later calls return the cached
+        listing, which this manager updates as it changes plugins.
+        
         Returns:
             List of plugin filenames
         """
-        if not self.plugins_dir.exists():
-            return []
-        
-        plugins = []
-        for plugin_file in self.plugins_dir.glob("*.smx"):
-            # Skip disabled plugins (*.smx.disabled)
-            if plugin_file.suffix == ".smx":
-                plugins.append(plugin_file.name)
-        
-        return plugins
+        if self._installed_plugins is None:
+            try:
+                # Disabled plugins (*.smx.disabled) don't match the suffix
+                with os.scandir(self.plugins_dir) as it:
+                    self._installed_plugins = [entry.name for entry in it
+                                               if entry.name.endswith('.smx') and entry.is_file()]
+            except FileNotFoundError:
+                return []
+        
+        return list(self._installed_plugins)
     
     def disable_plugin(self, plugin_name: str) -> bool:
         """
@@ -193,17 +359,17 @@ class PluginManager:
         if not plugin_name.endswith('.smx'):
             plugin_name += '.smx'
         
-        plugin_file = self.plugins_dir / plugin_name
-        disabled_file = self.plugins_dir / f"{plugin_name}.disabled"
-        
-        if not plugin_file.exists():
-            self.logger.error(f"Plugin not found: {plugin_name}")
-            return False
+        plugin_file = os.path.join(self._plugins_dir_str, plugin_name)
+        disabled_file = plugin_file + ".disabled"
         
         try:
-            plugin_file.rename(disabled_file)
+            self._rename(plugin_file, disabled_file)
+            self._forget_plugin(plugin_name)
             self.logger.success(f"Disabled plugin: {plugin_name}")
             return True
+        except FileNotFoundError:
+            self.logger.error(f"Plugin not found: {plugin_name}")
+            return False
         except Exception as e:
             self.logger.error(f"Failed to disable plugin: {e}")
             return False
@@ -221,17 +387,17 @@ class PluginManager:
         if not plugin_name.endswith('.smx'):
             plugin_name += '.smx'
         
-        disabled_file = self.plugins_dir / f"{plugin_name}.disabled"
-        plugin_file = self.plugins_dir / plugin_name
-        
-        if not disabled_file.exists():
-            self.logger.error(f"Disabled plugin not found: {plugin_name}.disabled")
-            return False
+        plugin_file = os.path.join(self._plugins_dir_str, plugin_name)
+        disabled_file = plugin_file + ".disabled"
         
         try:
-            disabled_file.rename(plugin_file)
+            self._rename(disabled_file, plugin_file)
+            self._remember_plugin(plugin_name)
             self.logger.success(f"Enabled plugin: {plugin_name}")
             return True
+        except FileNotFoundError:
+            self.logger.error(f"Disabled plugin not found: {plugin_name}.disabled")
+            return False
         except Exception as e:
             self.logger.error(f"Failed to enable plugin: {e}")
             return False
@@ -249,16 +415,16 @@ class PluginManager:
         if not plugin_name.endswith('.smx'):
             plugin_name += '.smx'
         
-        plugin_file = self.plugins_dir / plugin_name
-        
-        if not plugin_file.exists():
-            self.logger.error(f"Plugin not found: {plugin_name}")
-            return False
+        plugin_file = os.path.join(self._plugins_dir_str, plugin_name)
         
         try:
-            plugin_file.unlink()
+            os.unlink(plugin_file)
+            self._forget_plugin(plugin_name)
             self.logger.success(f"Removed plugin: {plugin_name}")
             return True
+        except FileNotFoundError:
+            self.logger.error(f"Plugin not found: {plugin_name}")
+            return False
         except Exception as e:
             self.logger.error(f"Failed to remove plugin: {e}")
             return False
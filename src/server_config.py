@@ -4,81 +4,18 @@ Server configuration module for CS:GO Legacy HvH servers
 Handles server.cfg generation and steam.inf modification
 """
 
+import functools
+import os
+import re
 import shutil
+import string
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from logger import get_logger
 
 
-class ServerConfigurator:
-    """Manages CS:GO server configuration for HvH"""
-    
-    # CS:GO Legacy version for HvH (pre-CS2)
-    CSGO_LEGACY_VERSION = "2000258"
-    
-    def __init__(self, csgo_install_dir: Path):
-        self.csgo_install_dir = csgo_install_dir
-        self.logger = get_logger()
-        
-        self.csgo_dir = csgo_install_dir / "csgo"
-        self.cfg_dir = self.csgo_dir / "cfg"
-        self.steam_inf = self.csgo_dir / "steam.inf"
-    
-    def create_hvh_config(self, 
-                          hostname: str = "VileHvH Server",
-                          rcon_password: str = "change_me",
-                          sv_password: str = "",
-                          tickrate: int = 128,
-                          enable_hvh_plugins: bool = False) -> bool:
-        """
-        Create optimized HvH server configuration
-        
-        Args:
-            hostname: Server name
-            rcon_password: RCON password
-            sv_password: Server password (empty = public)
-            tickrate: Server tickrate (64 or 128)
-            enable_hvh_plugins: Enable HvH plugin CVars (HvH-gg Essentials)
-        
-        Returns:
-            True if successful
-        """
-        self.logger.section("Creating HvH Server Configuration")
-        
-        # Ensure cfg directory exists
-        self.cfg_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate server.cfg
-        config = self._generate_hvh_config(hostname, rcon_password, sv_password, tickrate, enable_hvh_plugins)
-        
-        server_cfg = self.cfg_dir / "server.cfg"
-        
-        try:
-            # Backup existing config if present
-            if server_cfg.exists():
-                backup = self.cfg_dir / "server.cfg.backup"
-                shutil.copy(server_cfg, backup)
-                self.logger.info(f"Backed up existing config to: {backup}")
-            
-            # Write new config
-            with open(server_cfg, 'w') as f:
-                f.write(config)
-            
-            self.logger.success(f"HvH config created: {server_cfg}")
-            return True
-        
-        except Exception as e:
-            self.logger.error(f"Failed to create config: {e}")
-            return False
-    
-    def _generate_hvh_config(self, hostname: str, rcon_password: str, 
-                            sv_password: str, tickrate: int, enable_hvh_plugins: bool) -> str:
-        """Generate HvH-optimized server.cfg content"""
-        
-        # Prepare HvH plugin configuration section
-        hvh_plugin_config = ""
-        if enable_hvh_plugins:
-            hvh_plugin_config = """
+# HvH plugin CVars (HvH-gg Essentials), added when the plugins are enabled
+_HVH_PLUGIN_CFG = """
 // ============================================================
 // HVH PLUGIN CONFIGURATION (HvH-gg Essentials)
 // ============================================================
@@ -94,17 +31,18 @@ hvh_restrict_extended_angles 1      // Restrict extended angles
 hvh_restrict_fake_duck 0            // Allow fake duck (common HvH technique)
 hvh_restrict_ax 1                   // Restrict anti-exploit/anti-aim abuse
 """
-        
-        return f"""// VileHvH CS:GO Legacy Server Configuration
+
+# server.cfg body; only the server identity, tickrate and plugin section vary
+_HVH_CFG_TEMPLATE = string.Template("""// VileHvH CS:GO Legacy Server Configuration
 // Optimized for Hack vs Hack gameplay
 // Generated automatically - edit as needed
 
 // ============================================================
 // SERVER IDENTITY
 // ============================================================
-hostname "{hostname}"
-sv_password "{sv_password}"
-rcon_password "{rcon_password}"
+hostname "${hostname}"
+sv_password "${sv_password}"
+rcon_password "${rcon_password}"
 
 // ============================================================
 // HvH SETTINGS (IMPORTANT!)
@@ -158,13 +96,13 @@ cash_player_bomb_defused 0
 // ============================================================
 // TICKRATE & NETWORK SETTINGS
 // ============================================================
-// Server tickrate: {tickrate} (set via launch options)
+// Server tickrate: ${tickrate} (set via launch options)
 sv_minrate 128000
 sv_maxrate 0             // Unlimited
-sv_minupdaterate {tickrate}
-sv_maxupdaterate {tickrate}
-sv_mincmdrate {tickrate}
-sv_maxcmdrate {tickrate}
+sv_minupdaterate ${tickrate}
+sv_maxupdaterate ${tickrate}
+sv_mincmdrate ${tickrate}
+sv_maxcmdrate ${tickrate}
 fps_max 0                // Unlimited server FPS
 
 // Network Optimization
@@ -269,7 +207,7 @@ inferno_max_flames 16
 sv_grenade_trajectory 0
 sv_showimpacts 0
 
-{hvh_plugin_config}
+${hvh_plugin_config}
 
 // ============================================================
 // EXECUTION
@@ -280,13 +218,164 @@ exec banned_ip.cfg
 echo ""
 echo "============================================================"
 echo "  VileHvH Server Configuration Loaded"
-echo "  Mode: Deathmatch | Tickrate: {tickrate}"
-echo "  Max Money: $16000 | Buy Anytime/Anywhere"
+echo "  Mode: Deathmatch | Tickrate: ${tickrate}"
+echo "  Max Money: $$16000 | Buy Anytime/Anywhere"
 echo "  Instant Respawn | Friendly Fire: OFF"
 echo "  HvH Mode: Enabled (-insecure required)"
 echo "============================================================"
 echo ""
-"""
+""")
+
+
+# ClientVersion/ServerVersion lines in steam.inf
+_VERSION_RE = re.compile(r'^(Client|Server)Version=(.*)$', re.MULTILINE)
+
+
+# The template with the tickrate already filled in, for the common tickrates
+# (replaced in the template source, so escapes like $$16000 are kept)
+_HVH_CFG_BY_TICKRATE = {
+    tickrate: string.Template(_HVH_CFG_TEMPLATE.template.replace("${tickrate}", str(tickrate)))
+    for tickrate in (64, 128)
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _render_hvh_config(hostname: str, rcon_password: str, sv_password: str,
+                       tickrate: int, enable_hvh_plugins: bool) -> str:
+    """Fill in the server.cfg template (memoized per settings)"""
+    template = _HVH_CFG_BY_TICKRATE.get(tickrate, _HVH_CFG_TEMPLATE)
+    return template.substitute(
+        hostname=hostname,
+        rcon_password=rcon_password,
+        sv_password=sv_password,
+        tickrate=tickrate,
+        hvh_plugin_config=_HVH_PLUGIN_CFG if enable_hvh_plugins else ""
+    )
+
+
+class ServerConfigurator:
+    """Manages CS:GO server configuration for HvH"""
+    
+    # CS:GO Legacy version for HvH (pre-CS2)
+    CSGO_LEGACY_VERSION = "2000258"
+    
+    def __init__(self, csgo_install_dir: Path):
+        self.csgo_install_dir = csgo_install_dir
+        self.logger = get_logger()
+        
+        self.csgo_dir = csgo_install_dir / "csgo"
+        self.cfg_dir = self.csgo_dir / "cfg"
+        self.steam_inf = self.csgo_dir / "steam.inf"
+    
+    def create_hvh_config(self, 
+                          hostname: str = "VileHvH Server",
+                          rcon_password: str = "change_me",
+                          sv_password: str = "",
+                          tickrate: int = 128,
+                          enable_hvh_plugins: bool = False) -> bool:
+        """
+        Create optimized HvH server configuration
+        
+        Args:
+            hostname: Server name
+            rcon_password: RCON password
+            sv_password: Server password (empty = public)
+            tickrate: Server tickrate (64 or 128)
+            enable_hvh_plugins: Enable HvH plugin CVars (HvH-gg Essentials)
+        
+        Returns:
+            True if successful
+        """
+        self.logger.section("Creating HvH Server Configuration")
+        
+        # Ensure cfg directory exists
+        self.cfg_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Generate server.cfg
+        config = self._generate_hvh_config(hostname, rcon_password, sv_password, tickrate, enable_hvh_plugins)
+        
+        server_cfg = self.cfg_dir / "server.cfg"
+        
+        try:
+            existing = self._read_existing(server_cfg)
+            
+            # Re-run with the same settings: leave the config (and its backup) alone
+            if existing == config:
+                self.logger.success(f"HvH config already up to date: {server_cfg}")
+                return True
+            
+            # Write new config, backing up the existing one if present
+            if existing is not None:
+                backup = self.cfg_dir / "server.cfg.backup"
+                self._replace_file(server_cfg, config, backup, existing)
+                self.logger.info(f"Backed up existing config to: {backup}")
+            else:
+                self._replace_file(server_cfg, config)
+            
+            self.logger.success(f"HvH config created: {server_cfg}")
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Failed to create config: {e}")
+            return False
+    
+    @staticmethod
+    def _read_existing(path: Path) -> Optional[str]:
+        """Read a file's current contents, or None if it doesn't exist"""
+        try:
+            return path.read_text()
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _write_file(path: Path, text: str):
+        """Write a small text file as its UTF-8 bytes in one call"""
+        path.write_bytes(text.encode('utf-8'))
+    
+    def _replace_file(self, path: Path, text: str,
+                      backup: Optional[Path] = None, previous: Optional[str] = None):
+        """
+        Replace a file's contents through a temp file and an atomic rename
+        
+        Since the original is renamed over rather than rewritten in place,
+        the backup can be a hard link to it (no data copied). Where hard
+        links aren't possible the backup is written from `previous`. A
+        symlinked file is replaced at its target, and the file's permission
+        bits are kept.
+        
+        Args:
+            path: File to replace
+            text: New contents
+            backup: Where to keep the current file (optional)
+            previous: Current contents, for when the backup can't be a hard link
+        """
+        path = path.resolve()
+        tmp = path.with_name(path.name + ".tmp")
+        
+        try:
+            self._write_file(tmp, text)
+            try:
+                shutil.copymode(path, tmp)
+            except FileNotFoundError:
+                # New file: keep the umask defaults
+                pass
+            
+            if backup is not None:
+                backup.unlink(missing_ok=True)
+                try:
+                    os.link(path, backup)
+                except OSError:
+                    self._write_file(backup, previous)
+            
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+    
+    def _generate_hvh_config(self, hostname: str, rcon_password: str, 
+                            sv_password: str, tickrate: int, enable_hvh_plugins: bool) -> str:
+        """Generate HvH-optimized server.cfg content"""
+        return _render_hvh_config(hostname, rcon_password, sv_password, tickrate, enable_hvh_plugins)
     
     def set_legacy_version(self) -> bool:
         """
@@ -303,52 +392,42 @@ echo ""
         """
         self.logger.info("Setting CS:GO Legacy version in steam.inf")
         
-        if not self.steam_inf.exists():
-            self.logger.error(f"steam.inf not found: {self.steam_inf}")
-            return False
-        
         try:
             # Read current steam.inf
-            with open(self.steam_inf, 'r') as f:
-                lines = f.readlines()
+            original = self._read_existing(self.steam_inf)
+            if original is None:
+                self.logger.error(f"steam.inf not found: {self.steam_inf}")
+                return False
             
-            # Backup
-            backup = self.steam_inf.parent / "steam.inf.backup"
-            shutil.copy(self.steam_inf, backup)
-            self.logger.debug(f"Backed up steam.inf to: {backup}")
+            # Modify both ClientVersion and ServerVersion in a single pass
+            # over the whole file (lookups are hoisted out of the callback,
+            # which runs once per matching line)
+            found = set()
+            log_info = self.logger.info
+            version = self.CSGO_LEGACY_VERSION
             
-            # Track modifications
-            client_version_modified = False
-            server_version_modified = False
+            def set_version(match):
+                key = f'{match.group(1)}Version'
+                found.add(key)
+                log_info(f"Changed {key}: {match.group(2).rstrip()} → {version}")
+                return f'{key}={version}'
             
-            # Modify both ClientVersion and ServerVersion
-            for i, line in enumerate(lines):
-                # Modify ClientVersion
-                if line.startswith('ClientVersion='):
-                    old_version = line.strip().split('=')[1]
-                    lines[i] = f'ClientVersion={self.CSGO_LEGACY_VERSION}\n'
-                    client_version_modified = True
-                    self.logger.info(f"Changed ClientVersion: {old_version} → {self.CSGO_LEGACY_VERSION}")
-                
-                # Modify ServerVersion
-                elif line.startswith('ServerVersion='):
-                    old_version = line.strip().split('=')[1]
-                    lines[i] = f'ServerVersion={self.CSGO_LEGACY_VERSION}\n'
-                    server_version_modified = True
-                    self.logger.info(f"Changed ServerVersion: {old_version} → {self.CSGO_LEGACY_VERSION}")
+            updated = _VERSION_RE.sub(set_version, original)
             
             # Add missing lines if needed
-            if not client_version_modified:
-                self.logger.warning("ClientVersion not found, appending...")
-                lines.append(f'ClientVersion={self.CSGO_LEGACY_VERSION}\n')
+            missing = [key for key in ("ClientVersion", "ServerVersion") if key not in found]
+            if missing:
+                if updated and not updated.endswith('\n'):
+                    updated += '\n'
+                for key in missing:
+                    self.logger.warning(f"{key} not found, appending...")
+                    updated += f'{key}={self.CSGO_LEGACY_VERSION}\n'
             
-            if not server_version_modified:
-                self.logger.warning("ServerVersion not found, appending...")
-                lines.append(f'ServerVersion={self.CSGO_LEGACY_VERSION}\n')
-            
-            # Write modified steam.inf
-            with open(self.steam_inf, 'w') as f:
-                f.writelines(lines)
+            # Write modified steam.inf (unless it already had both versions)
+            if updated != original:
+                backup = self.steam_inf.parent / "steam.inf.backup"
+                self._replace_file(self.steam_inf, updated, backup, original)
+                self.logger.debug(f"Backed up steam.inf to: {backup}")
             
             self.logger.success(f"steam.inf configured for CS:GO Legacy")
             self.logger.info(f"  ClientVersion: {self.CSGO_LEGACY_VERSION}")
@@ -359,6 +438,59 @@ echo ""
             self.logger.error(f"Failed to modify steam.inf: {e}")
             return False
     
+    @functools.cached_property
+    def server_exe(self) -> Path:
+        """Server executable (srcds_run, or srcds.exe on Windows installs), resolved once"""
+        if self.csgo_install_dir.exists():
+            server_exe = self.csgo_install_dir / "srcds_run"
+            if not server_exe.exists():
+                server_exe = self.csgo_install_dir / "srcds.exe"
+            return server_exe
+        
+        return Path("./srcds_run")
+    
+    def get_hvh_launch_args(self,
+                            map_name: str = "de_mirage",
+                            tickrate: int = 128,
+                            maxplayers: int = 10,
+                            port: int = 27015,
+                            gslt: str = "") -> List[str]:
+        """
+        Generate HvH server launch arguments
+        
+        The list can be passed straight to subprocess without a shell.
+        
+        Args:
+            map_name: Starting map (default: de_mirage)
+            tickrate: Server tickrate
+            maxplayers: Max players
+            port: Server port
+            gslt: Game Server Login Token (GSLT)
+        
+        Returns:
+            Server executable followed by its arguments
+        """
+        # HvH MUST use -insecure flag to disable VAC
+        args = [
+            str(self.server_exe),
+            "-game", "csgo",
+            "-console",
+            "-usercon",
+            "-insecure",  # CRITICAL for HvH!
+            "-tickrate", str(tickrate),
+            "-port", str(port),
+            "-maxplayers_override", str(maxplayers),
+            "+game_type", "1",  # Gun Game (for DM)
+            "+game_mode", "2",  # Deathmatch
+            "+map", map_name,
+        ]
+        
+        # Add GSLT if provided
+        if gslt:
+            args += ["+sv_setsteamaccount", gslt]
+        
+        return args
+    
     def get_hvh_launch_command(self, 
                               map_name: str = "de_mirage",
                               tickrate: int = 128,
@@ -378,33 +510,7 @@ echo ""
         Returns:
             Launch command string
         """
-        if self.csgo_install_dir.exists():
-            server_exe = self.csgo_install_dir / "srcds_run"
-            if not server_exe.exists():
-                server_exe = self.csgo_install_dir / "srcds.exe"
-        else:
-            server_exe = Path("./srcds_run")
-        
-        # HvH MUST use -insecure flag to disable VAC
-        cmd = (
-            f"{server_exe} "
-            f"-game csgo "
-            f"-console "
-            f"-usercon "
-            f"-insecure "  # CRITICAL for HvH!
-            f"-tickrate {tickrate} "
-            f"-port {port} "
-            f"-maxplayers_override {maxplayers} "
-            f"+game_type 1 "  # Gun Game (for DM)
-            f"+game_mode 2 "  # Deathmatch
-            f"+map {map_name}"
-        )
-        
-        # Add GSLT if provided
-        if gslt:
-            cmd += f" +sv_setsteamaccount {gslt}"
-        
-        return cmd
+        return " ".join(self.get_hvh_launch_args(map_name, tickrate, maxplayers, port, gslt))
     
     def save_gslt(self, gslt: str) -> bool:
         """
@@ -418,8 +524,8 @@ echo ""
         """
         try:
             gslt_file = self.csgo_dir / "gslt.txt"
-            with open(gslt_file, 'w') as f:
-                f.write(gslt)
+            if self._read_existing(gslt_file) != gslt:
+                self._replace_file(gslt_file, gslt)
             self.logger.success(f"GSLT saved to: {gslt_file}")
             return True
         except Exception as e:
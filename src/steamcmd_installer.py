@@ -4,17 +4,32 @@ SteamCMD installation module
 Handles installing SteamCMD on different platforms with proper methods
 """
 
+import io
 import os
+import shutil
 import subprocess
 import urllib.request
 import zipfile
 import tarfile
 from pathlib import Path
 from typing import Optional
+from file_utils import COPY_BUFSIZE, extract_zip
 from logger import get_logger
 from system_detect import SystemInfo, OSType, PackageManager, run_command, check_command_exists
 
 
+# Installer method for each known distro family
+_DISTRO_FAMILIES = {
+    # Arch-based distros (use AUR)
+    "_install_arch": ("arch", "manjaro", "endeavouros"),
+    # Debian/Ubuntu-based distros
+    "_install_debian": ("ubuntu", "debian", "linuxmint", "pop"),
+    # Fedora/RHEL-based distros
+    "_install_fedora": ("fedora", "rhel", "centos"),
+}
+_DISTRO_INSTALLERS = {distro: method for method, distros in _DISTRO_FAMILIES.items() for distro in distros}
+
+
 class SteamCMDInstaller:
     """Handles SteamCMD installation across different platforms"""
     
@@ -22,6 +37,9 @@ class SteamCMDInstaller:
         self.sys_info = sys_info
         self.logger = get_logger()
         
+        # Cached result of is_installed() (None = not checked yet)
+        self._installed: Optional[bool] = None
+        
         # Determine SteamCMD paths based on OS
         if sys_info.os_type == OSType.WINDOWS:
             self.steamcmd_dir = Path("C:/steamcmd")
@@ -31,12 +49,25 @@ class SteamCMDInstaller:
             self.steamcmd_dir = Path.home() / "steamcmd"
             self.steamcmd_exe = self.steamcmd_dir / "steamcmd.sh"
     
+    @property
+    def steamcmd_exe(self) -> Path:
+        """Path to the SteamCMD executable"""
+        return self._steamcmd_exe
+    
+    @steamcmd_exe.setter
+    def steamcmd_exe(self, path: Path):
+        self._steamcmd_exe = path
+        # A new path has to be checked again
+        self._installed = None
+    
     def is_installed(self) -> bool:
-        """Check if SteamCMD is already installed"""
-        if self.steamcmd_exe.exists():
+        """Check if SteamCMD is already installed (cached until the path changes or an install runs)"""
+        if self._installed is None:
+            self._installed = self.steamcmd_exe.exists()
+        
+        if self._installed:
             self.logger.info(f"SteamCMD already installed at: {self.steamcmd_dir}")
-            return True
-        return False
+        return self._installed
     
     def install(self) -> bool:
         """
@@ -63,22 +94,13 @@ class SteamCMDInstaller:
         """Install SteamCMD on Linux"""
         distro = self.sys_info.distro
         
-        # Arch-based distros (use AUR)
-        if distro in ["arch", "manjaro", "endeavouros"]:
-            return self._install_arch()
-        
-        # Debian/Ubuntu-based distros
-        elif distro in ["ubuntu", "debian", "linuxmint", "pop"]:
-            return self._install_debian()
-        
-        # Fedora/RHEL-based distros
-        elif distro in ["fedora", "rhel", "centos"]:
-            return self._install_fedora()
-        
-        # Generic Linux fallback (manual download)
-        else:
+        method = _DISTRO_INSTALLERS.get(distro)
+        if method is None:
+            # Generic Linux fallback (manual download)
             self.logger.warning(f"Unknown distro '{distro}', using generic installation method")
-            return self._install_linux_generic()
+            method = "_install_linux_generic"
+        
+        return getattr(self, method)()
     
     def _install_arch(self) -> bool:
         """Install SteamCMD on Arch Linux using AUR"""
@@ -120,12 +142,11 @@ class SteamCMDInstaller:
         
         # Clone AUR package
         aur_dir = Path("/tmp/steamcmd-aur")
-        if aur_dir.exists():
-            subprocess.run(["rm", "-rf", str(aur_dir)])
+        shutil.rmtree(aur_dir, ignore_errors=True)
         
         try:
             subprocess.run(
-                ["git", "clone", "https://aur.archlinux.org/steamcmd.git", str(aur_dir)],
+                ["git", "clone", "https://aur.archlinux.org/steamcmd.git", aur_dir],
                 check=True
             )
             
@@ -148,25 +169,39 @@ class SteamCMDInstaller:
         """Install SteamCMD on Debian/Ubuntu"""
         self.logger.info("Installing SteamCMD on Debian/Ubuntu")
         
-        # Enable i386 architecture (32-bit support)
-        self.logger.info("Enabling i386 architecture...")
-        try:
-            subprocess.run(["sudo", "dpkg", "--add-architecture", "i386"], check=True)
-            self.logger.success("i386 architecture enabled")
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Failed to enable i386 architecture: {e}")
+        # Authenticate sudo once up front so the two commands below don't
+        # both prompt for a password at the same time
+        sudo_status = subprocess.run(["sudo", "-v"]).returncode
+        if sudo_status != 0:
+            self.logger.error(f"sudo authentication failed (exit status {sudo_status})")
             return False
         
-        # Add multiverse repository (Ubuntu)
+        # Enable i386 architecture (32-bit support) and, on Ubuntu, the
+        # multiverse repository; the two are independent, so run them
+        # concurrently and wait for both before updating the package list
+        self.logger.info("Enabling i386 architecture...")
+        dpkg = subprocess.Popen(["sudo", "dpkg", "--add-architecture", "i386"])
+        
+        multiverse = None
         if self.sys_info.distro == "ubuntu":
-            self.logger.info("Enabling multiverse repository...")
-            try:
-                subprocess.run(
-                    ["sudo", "add-apt-repository", "-y", "multiverse"],
-                    check=True
-                )
+            if check_command_exists("add-apt-repository"):
+                self.logger.info("Enabling multiverse repository...")
+                multiverse = subprocess.Popen(["sudo", "add-apt-repository", "-y", "multiverse"])
+            else:
+                self.logger.warning("add-apt-repository not found, skipping multiverse repository")
+        
+        dpkg_status = dpkg.wait()
+        multiverse_status = multiverse.wait() if multiverse else None
+        
+        if dpkg_status != 0:
+            self.logger.error(f"Failed to enable i386 architecture: dpkg exited with status {dpkg_status}")
+            return False
+        self.logger.success("i386 architecture enabled")
+        
+        if multiverse:
+            if multiverse_status == 0:
                 self.logger.success("Multiverse repository enabled")
-            except subprocess.CalledProcessError:
+            else:
                 self.logger.warning("Could not enable multiverse repository")
         
         # Update package list
@@ -187,10 +222,16 @@ class SteamCMDInstaller:
             self.logger.success("SteamCMD installed via apt")
             
             # SteamCMD is usually installed to /usr/games/steamcmd
-            self.steamcmd_exe = Path("/usr/games/steamcmd")
-            if not self.steamcmd_exe.exists():
+            # (one stat tells us both where it is and that it's installed)
+            games_exe = Path("/usr/games/steamcmd")
+            try:
+                games_exe.stat()
+            except FileNotFoundError:
                 # Alternative location
                 self.steamcmd_exe = Path("/usr/bin/steamcmd")
+            else:
+                self.steamcmd_exe = games_exe
+                self._installed = True
             
             return True
         
@@ -212,34 +253,24 @@ class SteamCMDInstaller:
         # Create directory
         self.steamcmd_dir.mkdir(parents=True, exist_ok=True)
         
-        # Download SteamCMD
+        # Download SteamCMD and extract it straight from the response
+        # (streaming tar mode, no temporary tarball on disk)
         steamcmd_url = "https://steamcdn-a.akamaihd.net/client/installer/steamcmd_linux.tar.gz"
-        tar_file = self.steamcmd_dir / "steamcmd_linux.tar.gz"
-        
-        self.logger.info(f"Downloading SteamCMD from {steamcmd_url}...")
-        try:
-            urllib.request.urlretrieve(steamcmd_url, tar_file)
-            self.logger.success("Download complete")
-        except Exception as e:
-            self.logger.error(f"Failed to download SteamCMD: {e}")
-            return False
         
-        # Extract tarball
-        self.logger.info("Extracting SteamCMD...")
+        self.logger.info(f"Downloading and extracting SteamCMD from {steamcmd_url}...")
         try:
-            with tarfile.open(tar_file, "r:gz") as tar:
+            with urllib.request.urlopen(steamcmd_url) as response, \
+                    tarfile.open(fileobj=response, mode="r|gz", bufsize=COPY_BUFSIZE) as tar:
                 tar.extractall(self.steamcmd_dir)
             self.logger.success("Extraction complete")
             
             # Make executable
             self.steamcmd_exe.chmod(0o755)
-            
-            # Clean up tarball
-            tar_file.unlink()
+            self._installed = True
             
             return True
         except Exception as e:
-            self.logger.error(f"Failed to extract SteamCMD: {e}")
+            self.logger.error(f"Failed to install SteamCMD: {e}")
             return False
     
     def _install_windows(self) -> bool:
@@ -250,13 +281,14 @@ class SteamCMDInstaller:
         self.steamcmd_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Created directory: {self.steamcmd_dir}")
         
-        # Download SteamCMD
+        # Download SteamCMD into memory (ZipFile needs a seekable file)
         steamcmd_url = "https://steamcdn-a.akamaihd.net/client/installer/steamcmd.zip"
-        zip_file = self.steamcmd_dir / "steamcmd.zip"
         
         self.logger.info(f"Downloading SteamCMD from {steamcmd_url}...")
         try:
-            urllib.request.urlretrieve(steamcmd_url, zip_file)
+            archive = io.BytesIO()
+            with urllib.request.urlopen(steamcmd_url) as response:
+                shutil.copyfileobj(response, archive, COPY_BUFSIZE)
             self.logger.success("Download complete")
         except Exception as e:
             self.logger.error(f"Failed to download SteamCMD: {e}")
@@ -265,13 +297,12 @@ class SteamCMDInstaller:
         # Extract ZIP
         self.logger.info("Extracting SteamCMD...")
         try:
-            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                zip_ref.extractall(self.steamcmd_dir)
+            with zipfile.ZipFile(archive, 'r') as zip_ref:
+                extract_zip(zip_ref, self.steamcmd_dir)
             self.logger.success("Extraction complete")
             
-            # Clean up ZIP file
-            zip_file.unlink()
-            
+            # The archive decides what exists now, check again next time
+            self._installed = None
             return True
         except Exception as e:
             self.logger.error(f"Failed to extract SteamCMD: {e}")
@@ -290,7 +321,7 @@ class SteamCMDInstaller:
         
         try:
             subprocess.run(
-                [str(self.steamcmd_exe), "+quit"],
+                [self.steamcmd_exe, "+quit"],
                 check=True,
                 cwd=self.steamcmd_dir
             )
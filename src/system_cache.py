@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for detected system information
+Lets repeated setup runs skip system detection
+"""
+
+import hashlib
+import json
+import os
+import platform
+from pathlib import Path
+from typing import Optional
+from logger import get_logger
+from system_detect import SystemInfo, OSType, PackageManager
+
+
+OS_RELEASE = "/etc/os-release"
+
+
+def get_cache_dir() -> Path:
+    """Get the VileHvH cache directory (~/.cache/vilehvh or $XDG_CACHE_HOME/vilehvh)"""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "vilehvh"
+
+
+def _cache_key() -> str:
+    """
+    Key for the current system
+
+    Covers the host name (home directories can be shared between machines),
+    the platform string, PATH (package managers are found through it) and
+    the mtime of /etc/os-release, so an upgrade or new package manager
+    invalidates the cache.
+    """
+    try:
+        os_release_mtime = os.stat(OS_RELEASE).st_mtime_ns
+    except OSError:
+        os_release_mtime = 0
+
+    raw = f"{platform.node()}\0{platform.platform()}\0{os.environ.get('PATH', '')}\0{os_release_mtime}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _os_type(value: str) -> OSType:
+    """OSType for a cached value (direct lookup; KeyError if unknown)"""
+    return OSType._value2member_map_[value]
+
+
+def _package_manager(value: str) -> PackageManager:
+    """PackageManager for a cached value (direct lookup; KeyError if unknown)"""
+    return PackageManager._value2member_map_[value]
+
+
+def load_cached_system() -> Optional[SystemInfo]:
+    """
+    Load cached system information
+
+    Returns:
+        SystemInfo if a cache entry for the current system exists, None otherwise
+    """
+    logger = get_logger()
+
+    try:
+        with open(get_cache_dir() / "system.json", "r") as f:
+            data = json.load(f)
+
+        if data.get("key") != _cache_key():
+            logger.debug("System cache is stale")
+            return None
+
+        info = data["system"]
+        return SystemInfo(
+            os_type=_os_type(info["os_type"]),
+            os_name=info["os_name"],
+            os_version=info["os_version"],
+            distro=info["distro"],
+            distro_version=info["distro_version"],
+            package_managers=tuple(_package_manager(pm) for pm in info["package_managers"]),
+            architecture=info["architecture"]
+        )
+
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.debug(f"Ignoring unreadable system cache: {e}")
+        return None
+
+
+def save_cached_system(sys_info: SystemInfo) -> SystemInfo:
+    """
+    Save system information to the cache
+
+    Args:
+        sys_info: Detected system information
+
+    Returns:
+        The same SystemInfo, so detection and saving can be chained
+    """
+    data = {
+        "key": _cache_key(),
+        "system": {
+            "os_type": sys_info.os_type.value,
+            "os_name": sys_info.os_name,
+            "os_version": sys_info.os_version,
+            "distro": sys_info.distro,
+            "distro_version": sys_info.distro_version,
+            "package_managers": [pm.value for pm in sys_info.package_managers],
+            "architecture": sys_info.architecture,
+        },
+    }
+
+    try:
+        cache_dir = get_cache_dir()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_dir / "system.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_dir / "system.json")
+    except OSError as e:
+        get_logger().debug(f"Could not write system cache: {e}")
+
+    return sys_info
@@ -3,12 +3,13 @@
 System detection module for OS, distro, and package manager detection
 """
 
-import platform
-import subprocess
-import shutil
+import functools
+import os
+import re
+import sys
 from enum import Enum
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Callable, Dict, FrozenSet, Iterator, Optional, List, Tuple
 from logger import get_logger
 
 
@@ -31,88 +32,220 @@ class PackageManager(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# os-release locations, in the order the os-release spec says to read them
+_OS_RELEASE_PATHS = ("/etc/os-release", "/usr/lib/os-release")
+
+# KEY=value line in os-release
+_OS_RELEASE_LINE_RE = re.compile(r'([A-Z][A-Z0-9_]*)=(.*)')
+
+# Package databases read directly instead of querying the package manager
+_PACMAN_LOCAL_DB = "/var/lib/pacman/local"
+_DPKG_STATUS = "/var/lib/dpkg/status"
+
+# Package managers to look for, in detection order (values are the command names)
+# (only the current platform's managers are looked for)
+if os.name == "nt":
+    _PACKAGE_MANAGER_COMMANDS = (
+        PackageManager.WINGET,
+        PackageManager.CHOCO,
+    )
+else:
+    _PACKAGE_MANAGER_COMMANDS = (
+        PackageManager.YAY,
+        PackageManager.PARU,
+        PackageManager.PACMAN,
+        PackageManager.APT,
+        PackageManager.DNF,
+    )
+
+# AUR helpers wrap pacman and only count where pacman is installed
+_PACMAN_HELPERS = frozenset({PackageManager.YAY.value, PackageManager.PARU.value})
+
+
+@dataclass(frozen=True)
 class SystemInfo:
-    """System information container"""
+    """System information container (immutable, so it can be shared and hashed)"""
+    # Fixed attribute layout instead of a per-instance __dict__
+    # (declared by hand; dataclass(slots=True) needs Python 3.10)
+    __slots__ = (
+        "os_type", "os_name", "os_version", "distro", "distro_version",
+        "package_managers", "architecture",
+    )
+    
     os_type: OSType
     os_name: str
     os_version: str
     distro: Optional[str]
     distro_version: Optional[str]
-    package_managers: List[PackageManager]
+    package_managers: Tuple[PackageManager, ...]
     architecture: str
     
-    def __str__(self):
-        pm_list = ", ".join([pm.value for pm in self.package_managers])
-        result = [
-            f"OS: {self.os_name} ({self.os_type.value})",
-            f"Version: {self.os_version}",
-            f"Architecture: {self.architecture}",
-        ]
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the human-readable summary"""
+        yield f"OS: {self.os_name} ({self.os_type.value})"
+        yield f"Version: {self.os_version}"
+        yield f"Architecture: {self.architecture}"
         if self.distro:
-            result.append(f"Distribution: {self.distro} {self.distro_version or ''}")
-        result.append(f"Package Managers: {pm_list}")
-        return "\n".join(result)
+            yield f"Distribution: {self.distro} {self.distro_version or ''}"
+        yield f"Package Managers: {', '.join(pm.value for pm in self.package_managers)}"
+    
+    def __str__(self):
+        return "\n".join(self.iter_lines())
 
 
-def run_command(cmd: List[str], capture_output: bool = True) -> tuple[bool, str]:
+def run_command(cmd: List[str], capture_output: bool = True, check_only: bool = False) -> tuple[bool, str]:
     """
     Run a command and return success status and output
     
     Args:
         cmd: Command and arguments as list
         capture_output: Whether to capture output
+        check_only: Only the exit status matters; output is discarded
+            (no pipes, no decoding)
     
     Returns:
         Tuple of (success, output)
     """
+    import subprocess
+    
+    # A missing program fails here instead of in a fork/exec attempt
+    # (lookups are cached, so the common case costs a dict hit)
+    if not check_command_exists(cmd[0]):
+        return False, ""
+    
     try:
-        if capture_output:
+        if check_only:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
+            return result.returncode == 0, ""
+        elif capture_output:
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
+                errors="replace",
                 timeout=10
             )
             return result.returncode == 0, result.stdout.strip()
         else:
             result = subprocess.run(cmd, timeout=10)
             return result.returncode == 0, ""
-    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+    except (subprocess.TimeoutExpired, OSError):
         return False, ""
 
 
+@functools.lru_cache(maxsize=256)
 def check_command_exists(cmd: str) -> bool:
-    """Check if a command exists in PATH"""
+    """
+    Check if a command exists in PATH
+    
+    Results are cached for the life of the process; call
+    check_command_exists.cache_clear() after changing PATH or installing
+    a command that was looked up before.
+    """
+    import shutil
+    
     return shutil.which(cmd) is not None
 
 
+def _find_on_path(commands) -> set:
+    """
+    Find which of the given commands exist in PATH
+    
+    Each PATH directory is listed once for all commands, instead of every
+    command probing every directory like repeated shutil.which calls do.
+    Only entries named like a wanted command are checked for being
+    executable. On Windows the PATHEXT extensions are stripped first.
+    
+    Args:
+        commands: Command names to look for
+    
+    Returns:
+        Set of the command names that were found
+    """
+    wanted = set(commands)
+    found = set()
+    
+    if os.name == "nt":
+        extensions = {ext.lower() for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep) if ext}
+    
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        if not directory:
+            continue
+        
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if os.name == "nt":
+                        name, ext = os.path.splitext(name.lower())
+                        if ext not in extensions:
+                            continue
+                    
+                    if (name in wanted and name not in found
+                            and entry.is_file() and os.access(entry.path, os.X_OK)):
+                        found.add(name)
+        except OSError:
+            continue
+    
+    return found
+
+
+def _parse_os_release(text: str) -> Dict[str, str]:
+    """
+    Parse os-release KEY=value lines
+    
+    Values are unquoted with shell rules (single or double quotes,
+    backslash escapes); blank lines and comments are skipped.
+    """
+    import shlex
+    
+    os_release = {}
+    for line in text.splitlines():
+        match = _OS_RELEASE_LINE_RE.match(line.strip())
+        if not match:
+            continue
+        
+        key, value = match.groups()
+        try:
+            words = shlex.split(value)
+        except ValueError:
+            # Unbalanced quotes; keep the value as written
+            words = [value.strip('"\'')]
+        os_release[key] = words[0] if words else ""
+    
+    return os_release
+
+
+@functools.lru_cache(maxsize=1)
 def detect_linux_distro() -> tuple[Optional[str], Optional[str]]:
     """
-    Detect Linux distribution and version
+    Detect Linux distribution and version (once per process)
     
     Returns:
         Tuple of (distro_name, distro_version)
     """
     logger = get_logger()
     
-    # Try /etc/os-release first (most modern distros)
-    try:
-        with open("/etc/os-release", "r") as f:
-            os_release = {}
-            for line in f:
-                line = line.strip()
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    os_release[key] = value.strip('"')
-            
-            distro_name = os_release.get("ID", "unknown")
-            distro_version = os_release.get("VERSION_ID", "")
-            
-            logger.debug(f"Detected distro from /etc/os-release: {distro_name} {distro_version}")
-            return distro_name, distro_version
-    except FileNotFoundError:
-        logger.debug("/etc/os-release not found")
+    # Try os-release first (most modern distros; /usr/lib/os-release is
+    # used on systems that don't ship /etc/os-release)
+    for path in _OS_RELEASE_PATHS:
+        try:
+            with open(path, "r") as f:
+                os_release = _parse_os_release(f.read())
+        except FileNotFoundError:
+            logger.debug(f"{path} not found")
+            continue
+        
+        distro_name = os_release.get("ID", "unknown")
+        distro_version = os_release.get("VERSION_ID", "")
+        
+        logger.debug(f"Detected distro from {path}: {distro_name} {distro_version}")
+        return distro_name, distro_version
     
     # Fallback: Try lsb_release command
     success, output = run_command(["lsb_release", "-is"])
@@ -133,82 +266,134 @@ def detect_package_managers() -> List[PackageManager]:
     Returns:
         List of detected package managers
     """
+    # Copy, so callers can't modify the cached result
+    return list(_find_package_managers())
+
+
+@functools.lru_cache(maxsize=1)
+def _find_package_managers() -> Tuple[PackageManager, ...]:
+    """Look up the package managers on PATH (once per process)"""
     logger = get_logger()
     managers = []
     
-    # Check for each package manager
-    if check_command_exists("yay"):
-        managers.append(PackageManager.YAY)
-        logger.debug("Found package manager: yay")
+    # Check for each package manager (one pass over PATH for all of them)
+    on_path = _find_on_path(pm.value for pm in _PACKAGE_MANAGER_COMMANDS)
+    if PackageManager.PACMAN.value not in on_path:
+        on_path -= _PACMAN_HELPERS
     
-    if check_command_exists("paru"):
-        managers.append(PackageManager.PARU)
-        logger.debug("Found package manager: paru")
-    
-    if check_command_exists("pacman"):
-        managers.append(PackageManager.PACMAN)
-        logger.debug("Found package manager: pacman")
-    
-    if check_command_exists("apt"):
-        managers.append(PackageManager.APT)
-        logger.debug("Found package manager: apt")
-    
-    if check_command_exists("dnf"):
-        managers.append(PackageManager.DNF)
-        logger.debug("Found package manager: dnf")
-    
-    if check_command_exists("winget"):
-        managers.append(PackageManager.WINGET)
-        logger.debug("Found package manager: winget")
-    
-    if check_command_exists("choco"):
-        managers.append(PackageManager.CHOCO)
-        logger.debug("Found package manager: choco")
+    for pm in _PACKAGE_MANAGER_COMMANDS:
+        if pm.value in on_path:
+            managers.append(pm)
+            logger.debug(f"Found package manager: {pm.value}")
     
     if not managers:
         managers.append(PackageManager.UNKNOWN)
         logger.warning("No known package managers detected")
     
-    return managers
+    return tuple(managers)
 
 
-def detect_system() -> SystemInfo:
+def detect_system(refresh: bool = False) -> SystemInfo:
     """
     Detect system information including OS, distro, and package managers
     
+    Uses the on-disk system cache (see system_cache) when it is still valid
+    for this system.
+    
+    Args:
+        refresh: Ignore the on-disk and in-process caches and detect again
+            (the on-disk cache is updated)
+    
     Returns:
         SystemInfo object with detected information
     """
+    # Imported here: system_cache imports this module
+    from system_cache import load_cached_system, save_cached_system
+    
     logger = get_logger()
     logger.section("System Detection")
     
-    # Detect OS type
-    system = platform.system().lower()
-    
-    if system == "linux":
-        os_type = OSType.LINUX
-        os_name = "Linux"
-        os_version = platform.release()
-        distro, distro_version = detect_linux_distro()
-    elif system == "windows":
-        os_type = OSType.WINDOWS
-        os_name = "Windows"
-        os_version = platform.version()
-        distro = None
-        distro_version = None
+    if refresh:
+        # The probes are memoized for the life of the process; forget them
+        # too, or a refresh would just re-save the first result
+        for cached_probe in (probe_system, detect_linux_distro, _find_package_managers,
+                             check_command_exists, _installed_packages):
+            cached_probe.cache_clear()
+        sys_info = None
     else:
-        os_type = OSType.UNKNOWN
-        os_name = system
-        os_version = platform.release()
-        distro = None
-        distro_version = None
+        sys_info = load_cached_system()
+    cached = sys_info is not None
+    if not cached:
+        sys_info = save_cached_system(probe_system())
+    
+    logger.info("System information (cached):" if cached else "System information detected:")
+    for line in sys_info.iter_lines():
+        logger.info(f"  {line}")
+    
+    return sys_info
+
+
+def _detect_linux() -> Tuple[OSType, str, str, Optional[str], Optional[str]]:
+    """OS type, name, version, distro and distro version on Linux"""
+    import platform
+    
+    distro, distro_version = detect_linux_distro()
+    return OSType.LINUX, "Linux", platform.release(), distro, distro_version
+
+
+def _detect_windows() -> Tuple[OSType, str, str, Optional[str], Optional[str]]:
+    """OS type, name, version, distro and distro version on Windows"""
+    import platform
+    
+    return OSType.WINDOWS, "Windows", platform.version(), None, None
+
+
+def _detect_other() -> Tuple[OSType, str, str, Optional[str], Optional[str]]:
+    """OS type, name, version, distro and distro version on unsupported systems"""
+    import platform
+    
+    return OSType.UNKNOWN, platform.system().lower(), platform.release(), None, None
+
+
+# OS detection for the platform we're running on (picked once at import)
+if sys.platform.startswith("linux"):
+    _detect_os = _detect_linux
+elif sys.platform == "win32":
+    _detect_os = _detect_windows
+else:
+    _detect_os = _detect_other
+
+
+@functools.lru_cache(maxsize=1)
+def probe_system() -> SystemInfo:
+    """
+    Detect system information without printing it (safe to run in the background)
+    
+    The OS, distro and package managers don't change while we run, so the
+    result is computed once per process and shared.
+    
+    Returns:
+        SystemInfo object with detected information
+    """
+    # Imported here so modules that only need the types (SystemInfo, OSType,
+    # PackageManager) don't pay for them
+    import platform
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # Detecting the OS (on Linux: reading os-release, maybe lsb_release) and
+    # scanning PATH for package managers are independent, so the OS is
+    # detected on a worker thread while the package managers are found here
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        os_future = executor.submit(_detect_os)
+        
+        # Detect package managers
+        package_managers = detect_package_managers()
+    
+    os_type, os_name, os_version, distro, distro_version = os_future.result()
     
     # Detect architecture
     architecture = platform.machine()
     
-    # Detect package managers
-    package_managers = detect_package_managers()
-    
     # Create system info object
     sys_info = SystemInfo(
         os_type=os_type,
@@ -216,17 +401,148 @@ def detect_system() -> SystemInfo:
         os_version=os_version,
         distro=distro,
         distro_version=distro_version,
-        package_managers=package_managers,
+        package_managers=tuple(package_managers),
         architecture=architecture
     )
     
-    logger.info("System information detected:")
-    for line in str(sys_info).split("\n"):
-        logger.info(f"  {line}")
-    
     return sys_info
 
 
+def _read_dpkg_status(path: str) -> FrozenSet[str]:
+    """Names of the installed packages in a dpkg status file"""
+    names = set()
+    package = None
+    
+    # Stanzas start with Package:, followed by Status: (e.g. "install ok installed")
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("Package: "):
+                package = line[9:].strip()
+            elif line.startswith("Status: ") and line.rstrip().endswith(" installed"):
+                names.add(package)
+    
+    return frozenset(names)
+
+
+def _installed_packages_native(pm: PackageManager) -> Optional[FrozenSet[str]]:
+    """
+    Names of all installed packages, read in-process from the package database
+    
+    Args:
+        pm: Package manager whose database to read
+    
+    Returns:
+        Installed package names, or None if the database can't be read this way
+    """
+    try:
+        if pm == PackageManager.PACMAN:
+            # One directory per package, named <name>-<version>-<release>
+            with os.scandir(_PACMAN_LOCAL_DB) as it:
+                return frozenset(entry.name.rsplit("-", 2)[0] for entry in it if entry.is_dir())
+        
+        if pm == PackageManager.APT:
+            return _read_dpkg_status(_DPKG_STATUS)
+        
+        if pm == PackageManager.DNF:
+            # RPM's Python bindings (python3-rpm), present on most RPM systems
+            try:
+                import rpm
+            except ImportError:
+                return None
+            
+            try:
+                names = (header[rpm.RPMTAG_NAME] for header in rpm.TransactionSet().dbMatch())
+                return frozenset(name.decode() if isinstance(name, bytes) else name for name in names)
+            except rpm.error:
+                return None
+    
+    except OSError:
+        return None
+    
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _installed_packages(pm: PackageManager) -> Optional[FrozenSet[str]]:
+    """
+    Names of all packages installed through a package manager
+    
+    The package database is read in-process where possible, otherwise with
+    one bulk query; either way once per package manager (cached), so
+    checking several packages doesn't start a process per package.
+    
+    Args:
+        pm: Package manager to query
+    
+    Returns:
+        Installed package names, or None if pm has no bulk query or it failed
+    """
+    names = _installed_packages_native(pm)
+    if names is not None:
+        return names
+    
+    if pm == PackageManager.PACMAN:
+        success, output = run_command(["pacman", "-Qq"])
+        names = output.split()
+    
+    elif pm == PackageManager.APT:
+        # Status "?i" = installed (skips packages removed but not purged)
+        success, output = run_command(["dpkg-query", "-W", "-f", "${db:Status-Abbrev} ${Package}\n"])
+        names = [line.split()[-1] for line in output.splitlines() if line[1:2] == "i"]
+    
+    elif pm == PackageManager.DNF:
+        success, output = run_command(["rpm", "-qa", "--qf", "%{NAME}\n"])
+        names = output.split()
+    
+    else:
+        return None
+    
+    if not success:
+        return None
+    return frozenset(names)
+
+
+def _check_pacman(package_name: str) -> bool:
+    """Ask pacman whether a single package is installed"""
+    success, _ = run_command(["pacman", "-Q", package_name], check_only=True)
+    return success
+
+
+def _check_apt(package_name: str) -> bool:
+    """Ask dpkg whether a single package is installed"""
+    success, output = run_command(["dpkg", "-l", package_name])
+    return success and package_name in output
+
+
+def _check_dnf(package_name: str) -> bool:
+    """Ask dnf whether a single package is installed"""
+    success, _ = run_command(["dnf", "list", "installed", package_name], check_only=True)
+    return success
+
+
+def _check_winget(package_name: str) -> bool:
+    """Ask winget whether a single package is installed"""
+    success, output = run_command(["winget", "list", "--id", package_name])
+    return success and package_name in output
+
+
+def _check_choco(package_name: str) -> bool:
+    """Ask Chocolatey whether a single package is installed"""
+    success, output = run_command(["choco", "list", "--local-only", package_name])
+    return success and package_name in output
+
+
+# Per-package check for each package manager (used when there is no
+# full list of installed packages for it)
+_PACKAGE_CHECKERS: Dict[PackageManager, Callable[[str], bool]] = {
+    PackageManager.PACMAN: _check_pacman,
+    PackageManager.APT: _check_apt,
+    PackageManager.DNF: _check_dnf,
+    PackageManager.WINGET: _check_winget,
+    PackageManager.CHOCO: _check_choco,
+}
+
+
 def check_package_installed(package_name: str, sys_info: SystemInfo) -> bool:
     """
     Check if a package is installed using available package managers
@@ -241,35 +557,18 @@ def check_package_installed(package_name: str, sys_info: SystemInfo) -> bool:
     logger = get_logger()
     
     for pm in sys_info.package_managers:
-        if pm == PackageManager.PACMAN:
-            success, _ = run_command(["pacman", "-Q", package_name])
-            if success:
-                logger.debug(f"Package {package_name} is installed (pacman)")
-                return True
-        
-        elif pm == PackageManager.APT:
-            success, output = run_command(["dpkg", "-l", package_name])
-            if success and package_name in output:
-                logger.debug(f"Package {package_name} is installed (apt/dpkg)")
-                return True
-        
-        elif pm == PackageManager.DNF:
-            success, _ = run_command(["dnf", "list", "installed", package_name])
-            if success:
-                logger.debug(f"Package {package_name} is installed (dnf)")
-                return True
-        
-        elif pm == PackageManager.WINGET:
-            success, output = run_command(["winget", "list", "--id", package_name])
-            if success and package_name in output:
-                logger.debug(f"Package {package_name} is installed (winget)")
-                return True
+        # Look the package up in the manager's full list when it has one;
+        # otherwise (or if that query failed) ask about this package alone
+        installed = _installed_packages(pm)
+        if installed is not None:
+            found = package_name in installed
+        else:
+            checker = _PACKAGE_CHECKERS.get(pm)
+            found = checker is not None and checker(package_name)
         
-        elif pm == PackageManager.CHOCO:
-            success, output = run_command(["choco", "list", "--local-only", package_name])
-            if success and package_name in output:
-                logger.debug(f"Package {package_name} is installed (choco)")
-                return True
+        if found:
+            logger.debug(f"Package {package_name} is installed ({pm.value})")
+            return True
     
     logger.debug(f"Package {package_name} is not installed")
     return False